@@ -0,0 +1,3 @@
+"""Standalone performance benchmarks. These are not part of the test suite, and each module can be run directly, e.g.
+``python -m benchmarks.game``.
+"""
@@ -0,0 +1,96 @@
+import os
+import random
+import pathlib
+import sqlite3
+import datetime
+import tempfile
+
+# Importing ``jeopardy`` requires a database file to exist, so make sure there's one to point to before anything else.
+os.environ.setdefault("DB_FILE", tempfile.NamedTemporaryFile(suffix=".db", delete=False).name)
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from jeopardy import web, config  # noqa: E402
+from jeopardy.upgrade import upgrade  # noqa: E402
+from jeopardy.api.models import Base  # noqa: E402
+
+SETS_PER_SHOW = 61
+VALUES = {0: (200, 400, 600, 800, 1000), 1: (400, 800, 1200, 1600, 2000), 2: (0,)}
+
+
+def generate(path: pathlib.Path, sets: int, seed: int = 0) -> pathlib.Path:
+    """Create a synthetic database shaped like the J-Archive corpus, with six categories of five sets in each of the
+    first two rounds, and a single Final Jeopardy! set, per show.
+
+    Args:
+        path (pathlib.Path): file to (re)create
+        sets (int): approximate number of sets to generate
+        seed (int, optional): seed for the random data. Defaults to 0.
+
+    Returns:
+        pathlib.Path: the database file
+    """
+    path.unlink(missing_ok=True)
+    Base.metadata.create_all(create_engine(f"sqlite:///{path}"))
+
+    rng = random.Random(seed)
+    con = sqlite3.connect(path)
+
+    con.executemany("INSERT INTO round (id, number) VALUES (?, ?)", [(number + 1, number) for number in VALUES])
+    con.executemany(
+        "INSERT INTO value (amount, round_id) VALUES (?, ?)",
+        [(amount, number + 1) for number, amounts in VALUES.items() for amount in amounts],
+    )
+    value_ids = {row[0]: row[1] for row in con.execute("SELECT amount, id FROM value")}
+
+    date = datetime.date(1984, 9, 10)
+    category_id = set_id = 0
+
+    for show in range(1, max(sets // SETS_PER_SHOW, 1) + 1):
+        date += datetime.timedelta(days=1)
+        con.execute(
+            "INSERT INTO date (id, year, month, day) VALUES (?, ?, ?, ?)", (show, date.year, date.month, date.day)
+        )
+        con.execute("INSERT INTO show (id, number, date_id) VALUES (?, ?, ?)", (show, show, show))
+
+        categories, rows = [], []
+
+        for number, amounts in VALUES.items():
+            for _ in range(6 if number < 2 else 1):
+                category_id += 1
+                categories.append((category_id, f"CATEGORY {rng.randrange(sets)}", show, show, number + 1, True))
+
+                for amount in amounts:
+                    set_id += 1
+                    answer = f"<p>Answer {set_id} {rng.random()}</p>"
+                    external = rng.random() < 0.02
+
+                    rows.append(
+                        (set_id, category_id, show, show, number + 1, value_ids[amount], external, set_id, answer, "q")
+                    )
+
+        con.executemany(
+            "INSERT INTO category (id, name, show_id, date_id, round_id, complete) VALUES (?, ?, ?, ?, ?, ?)",
+            categories,
+        )
+        con.executemany(
+            'INSERT INTO "set" (id, category_id, date_id, show_id, round_id, value_id, external, hash, answer, '
+            "question) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            rows,
+        )
+
+    con.commit()
+    con.close()
+
+    # Fill in the derived columns and tables (date ordinals, sort keys, category summaries, search indexes)
+    upgrade(create_engine(f"sqlite:///{path}"), rebuild=True)
+
+    return path
+
+
+def app(path: pathlib.Path):  # type: ignore[no-untyped-def]
+    """Create the Flask app serving a particular database file."""
+    config.api_db = f"sqlite:///{path}"
+    config.testing = True
+
+    return web.create_app()
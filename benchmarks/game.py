@@ -0,0 +1,65 @@
+"""Benchmark of ``/api/v1/game`` latency, and the number of SQL statements each request runs, as the corpus grows. Each
+size is run with the categories chosen by SQL, and by the in-memory columnar index (``COLUMNAR_GAMES``).
+
+Usage: ``python -m benchmarks.game [SETS ...]``
+"""
+
+import sys
+import time
+import pathlib
+import tempfile
+import statistics
+
+from sqlalchemy import event
+
+from jeopardy import config
+from benchmarks import corpus
+from jeopardy.api.models import db
+
+SIZES = (1_000, 10_000, 100_000, 1_000_000)
+REQUESTS = 50
+
+
+def run(sets: int, directory: pathlib.Path, columnar: bool) -> tuple[float, float, float]:
+    path = directory.joinpath(f"game-{sets}.db")
+
+    if not path.exists():
+        corpus.generate(path, sets=sets)
+
+    config.columnar_games = columnar
+    app = corpus.app(path)
+    client = app.test_client()
+
+    statements = 0
+
+    def count(*args: object) -> None:
+        nonlocal statements
+        statements += 1
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, "before_cursor_execute", count)
+
+    timings = []
+
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        assert client.get(f"/api/v{config.api_version}/game").status_code == 200
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1000, statistics.quantiles(timings, n=20)[-1] * 1000, statements / REQUESTS
+
+
+def main(sizes: tuple[int, ...]) -> None:
+    print(f"{'sets':>10} {'engine':>8} {'median ms':>10} {'p95 ms':>10} {'queries':>8}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for sets in sizes:
+            for columnar in (False, True):
+                median, p95, queries = run(sets, pathlib.Path(directory), columnar=columnar)
+                engine = "columnar" if columnar else "sql"
+                print(f"{sets:>10} {engine:>8} {median:>10.2f} {p95:>10.2f} {queries:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(i) for i in sys.argv[1:]) or SIZES)
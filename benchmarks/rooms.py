@@ -0,0 +1,69 @@
+"""Benchmark of the memory each active room (an ``alex.Game``, with the boards of every round) holds, measured with
+``tracemalloc``. The smaller the corpus, the more the clues of the rooms overlap.
+
+Usage: ``python -m benchmarks.rooms [SETS ...]``
+"""
+
+import gc
+import sys
+import pathlib
+import tempfile
+import tracemalloc
+
+from jeopardy import alex
+from benchmarks import corpus
+
+SIZES = (1_000, 100_000)
+ROOMS = 500
+WARMUP = 20
+
+
+def create(room: str) -> alex.Game:
+    game = alex.Game(game_settings={"size": 6, "room": room})
+    game.make_board()
+
+    if game.prefetching is not None:
+        game.prefetching.join()
+
+    return game
+
+
+def run(sets: int, directory: pathlib.Path, rooms: int = ROOMS) -> tuple[float, float]:
+    path = directory.joinpath(f"rooms-{sets}.db")
+
+    if not path.exists():
+        corpus.generate(path, sets=sets)
+
+    app = corpus.app(path)
+
+    with app.test_request_context():
+        # Fill any of the caches which aren't per room (compiled statements, etc.) before measuring
+        for number in range(WARMUP):
+            create(f"W{number}")
+
+        gc.collect()
+        tracemalloc.start()
+        before = tracemalloc.get_traced_memory()[0]
+
+        games = [create(f"R{number}") for number in range(rooms)]
+
+        gc.collect()
+        after = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+
+    boards = sum(len(game.boards) for game in games)
+
+    return (after - before) / rooms, (after - before) / boards
+
+
+def main(sizes: tuple[int, ...]) -> None:
+    print(f"{'sets':>10} {'rooms':>6} {'bytes/room':>12} {'bytes/board':>12}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        for sets in sizes:
+            per_room, per_board = run(sets, pathlib.Path(directory))
+            print(f"{sets:>10} {ROOMS:>6} {per_room:>12,.0f} {per_board:>12,.0f}")
+
+
+if __name__ == "__main__":
+    main(tuple(int(i) for i in sys.argv[1:]) or SIZES)
@@ -0,0 +1,60 @@
+"""Microbenchmark of serializing a page of each model: loading ORM objects and encoding them with ``ApiJSONProvider``,
+against selecting the columns and building the dicts with a compiled ``RowSerializer``.
+
+Usage: ``python -m benchmarks.serialize [SETS]``
+"""
+
+import sys
+import time
+import typing as t
+import pathlib
+import tempfile
+import statistics
+
+from sqlalchemy import select
+
+from benchmarks import corpus
+from jeopardy.api.models import Set, Show, Category, db
+from jeopardy.api.schemas import loading_plan, row_serializer
+
+PAGE = 200
+REPEATS = 200
+
+
+def timed(function: t.Callable[[], bytes | str]) -> tuple[float, bytes | str]:
+    timings, result = [], function()
+
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return statistics.median(timings) * 1000, result
+
+
+def main(sets: int) -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        app = corpus.app(corpus.generate(pathlib.Path(directory, "serialize.db"), sets=sets))
+
+        print(f"{'model':>10} {'orm ms':>10} {'rows ms':>10} {'speedup':>8}")
+
+        with app.app_context():
+            for model in (Set, Category, Show):
+                query = select(model).order_by(model.id).limit(PAGE)
+                serializer = row_serializer(model)
+
+                def orm() -> bytes | str:
+                    db.session.expunge_all()
+                    return app.json.dumps(db.session.scalars(query.options(*loading_plan(model))).all())
+
+                def rows() -> bytes | str:
+                    return app.json.dumps([serializer(row) for row in db.session.execute(serializer.select(query))])
+
+                (before, expected), (after, actual) = timed(orm), timed(rows)
+                assert actual == expected, f"{model.__name__} serializes differently"
+
+                print(f"{model.__name__:>10} {before:>10.2f} {after:>10.2f} {before / after:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000)
@@ -1,16 +1,31 @@
 import re
+import sys
 import json
 import random
+import typing
 import urllib
 import hashlib
+import logging
 import datetime
 import itertools
+import threading
+import contextlib
+import collections
 import dataclasses
 
+import flask
+
 # TODO: Move config stuff out of here. This should just be game logic
-from jeopardy import config
+from jeopardy import pool, config
+from jeopardy.api import games, database
 from jeopardy.api.models import Set
 
+# Hosts which mean the API endpoint is this server itself, so games can be built without going through HTTP
+LOCAL_HOSTS = {"localhost", "127.0.0.1", "::1", "0.0.0.0"}
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+logger = logging.getLogger(__name__)
+
 
 class Game:
     """Class definining the game itself, containing each player and the board itself."""
@@ -31,6 +46,9 @@ class Game:
 
         self.current_set: Set | None = None
 
+        self.boards: dict[int, Board] = {}
+        self.prefetching: threading.Thread | None = None
+
         if config.debug:
             self.add_player("Alex")
             self.add_player("Brad")
@@ -50,17 +68,82 @@ class Game:
         return self.score.add(name)
 
     def make_board(self):
-        """Create a game board.
+        """Create the game board for the current round, taking a game from the board pool when there's one with the
+        same settings, and otherwise building just the current round's board, while the boards of the rounds after it
+        are built in the background (see `self.prefetch()`).
+        """
+        rounds = range(self.round, 3)
+        params = {key: value for key, value in self.game_settings.items() if key != "round"}
+
+        # Wait for the boards of any earlier game still being built, so they can't be added to the new game's boards
+        if self.prefetching is not None:
+            self.prefetching.join()
+            self.prefetching = None
+
+        self.boards = {}
+
+        if (pooled := pool.take(params, rounds)) is not None:
+            self.boards = {
+                round_: Board(round_=round_, settings=params, game=game) for round_, game in zip(rounds, pooled)
+            }
+
+        self.show_board()
+
+    def show_board(self):
+        """Switch to the board for the current round, which is either already built, being built in the background, or
+        otherwise built now. Once it's shown, the boards of the following rounds start being built in the background.
 
         This will track the number of question/answer sets in each round, and runs the `self.board.add_wagers()` method
         to ensure the "Daily Doubles" are placed around the board.
         """
         self.remaining_content = config.sets if config.debug else self.size * 5
 
-        self.board = Board(round_=self.round, settings=self.game_settings)
+        if self.prefetching is not None:
+            self.prefetching.join()
+            self.prefetching = None
+
+        if (board := self.boards.get(self.round)) is None:
+            board = self.boards[self.round] = Board(
+                round_=self.round, settings=self.game_settings, exclude=self.used_categories()
+            )
+
+        self.board = board
 
         if not self.board.build_error:
             self.board.add_wagers()
+            self.prefetch()
+
+    def prefetch(self) -> None:
+        """Start building the boards of every round after the current one, with a single request to the API, in a
+        background (green) thread, leaving out the categories already used in the game.
+        """
+        rounds = [round_ for round_ in range(self.round + 1, 3) if round_ not in self.boards]
+
+        if not rounds:
+            return
+
+        app = flask.current_app._get_current_object() if flask.has_app_context() else None
+        exclude = self.used_categories()
+
+        def run() -> None:
+            # Any board which couldn't be built (for whatever reason) is just built again when it's needed
+            try:
+                with app.app_context() if app is not None else contextlib.nullcontext():
+                    for board in Board.for_rounds(rounds, settings=self.game_settings, exclude=exclude):
+                        if not board.build_error:
+                            self.boards.setdefault(board.round, board)
+
+            except Exception:
+                logger.exception(
+                    "Couldn't build the boards of rounds %s for room %s in the background", rounds, self.room
+                )
+
+        self.prefetching = threading.Thread(target=run, name=f"prefetch:{self.room}", daemon=True)
+        self.prefetching.start()
+
+    def used_categories(self) -> list[str]:
+        """The names of the categories on every board of the game so far."""
+        return [str(category) for board in self.boards.values() for category in board.categories]
 
     def round_text(self, upcoming: bool = False) -> str:
         """Return the text describing the title of the, by default, current round.
@@ -88,10 +171,10 @@ class Game:
             return "An error has occurred...."
 
     def start_next_round(self):
-        """Increment the round counter and remake the board with `self.make_board()`"""
+        """Increment the round counter and switch to that round's board with `self.show_board()`"""
 
         self.round += 1
-        self.make_board()
+        self.show_board()
 
     def html_board(self):
         """Using `zip()` return the game board, transposed, as needed to make the HTML representation"""
@@ -230,48 +313,72 @@ class Scoreboard:
 class Board:
     """Class to hold the Jeopardy game board. Contains methods to get categories and content."""
 
-    def __init__(self, round_: int, settings: dict):
+    def __init__(
+        self,
+        round_: int,
+        settings: dict,
+        game: list | None = None,
+        message: str = "",
+        exclude: typing.Sequence[str] = (),
+    ):
         self.round: int = round_
         self.categories: list = list()
         self.daily_doubles: list = list()
 
-        settings["round"] = self.round
+        if game is None and not message:
+            params = {key: value for key, value in settings.items() if key != "rounds"}
+            params["round"] = self.round
 
-        if self.round == 2:
-            settings["size"] = 1
+            if self.round == 2:
+                params["size"] = 1
 
-        params = urllib.parse.urlencode(settings)
+            if exclude:
+                params["exclude"] = list(exclude)
 
-        try:
-            api_data = urllib.request.urlopen(f"{config.api_endpoint}?{params}")
+            game, message = fetch(params)
 
-            game = json.loads(api_data.read().decode("utf-8"))
+        if message:
+            self.message = message
+            self.build_error = True
 
-            if isinstance(game, dict) and (error := game.get("message")):
-                self.message = error
-                self.build_error = True
+            return
 
-                return
+        for index, details in enumerate(game):
+            self.categories.append(Category(index=index, name=details["category"]["name"], sets=details["sets"]))
 
-            for index, details in enumerate(game):
-                self.categories.append(Category(index=index, name=details["category"]["name"], sets=details["sets"]))
+        self.build_error = False
 
-            self.build_error = False
+    @classmethod
+    def for_rounds(
+        cls, rounds: typing.Iterable[int], settings: dict, exclude: typing.Sequence[str] = ()
+    ) -> list["Board"]:
+        """Create the boards for several rounds with a single request to the API.
 
-        except urllib.error.HTTPError as error_data:
-            if error_data.code == 400:
-                data = json.loads(error_data.read().decode("utf-8"))
-                self.message = data["message"]
+        Required Arguments:
 
-            elif error_data.code == 404:
-                self.message = (
-                    "An error occurred finding the API. Please try restarting the server, or check your configuration."
-                )
+        rounds (typing.Iterable[int]) -- The round numbers to create boards for
+        settings (dict) -- The game settings, used as the parameters of the request
 
-            else:
-                self.message = "An unknown error occurred. Please submit a bug report with details!"
+        Optional Arguments:
 
-            self.build_error = True
+        exclude (typing.Sequence[str]) -- The names of any categories to leave out (default `()`)
+        """
+        rounds = list(rounds)
+
+        if not rounds:
+            return []
+
+        params = {key: value for key, value in settings.items() if key != "round"}
+
+        if exclude:
+            params["exclude"] = list(exclude)
+
+        data, message = fetch({**params, "rounds": ",".join(str(round_) for round_ in rounds)})
+
+        if message:
+            return [cls(round_=round_, settings=settings, message=message) for round_ in rounds]
+
+        return [cls(round_=round_, settings=settings, game=game) for round_, game in zip(rounds, data)]
 
     def add_wagers(self) -> None:
         """Randomly assign the "Daily Double" to the correct number of sets per round."""
@@ -289,13 +396,17 @@ class Board:
 class Category:
     """Class to hold one of the categories (ostensibly columns) on a Jeopardy game board."""
 
+    __slots__ = ("category", "index", "sets")
+
     def __init__(self, name: str, index: int, sets: list):
-        self.category = name
+        self.category = sys.intern(name)
         self.index = index
         self.sets: list = list()
 
         for set_ in sets:
-            self.sets.append(Content(set_["value"], set_["answer"], set_["question"], set_["date"], index))
+            self.sets.append(
+                Content(set_["value"], set_["answer"], set_["question"], set_["date"], index, set_id=set_.get("id"))
+            )
 
         self.sets.sort()
 
@@ -308,7 +419,46 @@ class Category:
         return str(self)
 
 
-@dataclasses.dataclass(eq=True, order=True)
+# The text of the most recently used sets, by set ID, so the rooms given the same sets share a single copy of it
+CLUES: collections.OrderedDict[int, tuple[str, str, str]] = collections.OrderedDict()
+CLUE_CACHE_SIZE = 10_000
+CLUES_LOCK = threading.Lock()
+
+
+@database.changed.connect
+def clear_clues(sender: typing.Any, **kwargs: typing.Any) -> None:
+    with CLUES_LOCK:
+        CLUES.clear()
+
+
+def clue(set_id: int | None, answer: str, question: str, date: str) -> tuple[str, str, str]:
+    """Get the text of a set (its answer, question and year), shared with any other board recently given the same set.
+
+    Required Arguments:
+
+    set_id (int | None) -- The ID of the set, without which the text isn't shared
+    answer (str) -- The answer (i.e., the clue read to the players)
+    question (str) -- The correct response
+    date (str) -- The date (in ISO format) the set first aired
+    """
+    if set_id is None:
+        return answer, question, sys.intern(datetime.datetime.fromisoformat(date).strftime("%Y"))
+
+    with CLUES_LOCK:
+        if (text := CLUES.get(set_id)) is not None:
+            CLUES.move_to_end(set_id)
+
+            return text
+
+        text = CLUES[set_id] = clue(None, answer, question, date)
+
+        if len(CLUES) > CLUE_CACHE_SIZE:
+            CLUES.popitem(last=False)
+
+        return text
+
+
+@dataclasses.dataclass(eq=True, order=True, slots=True)
 class Content:
     value: int
     answer: str
@@ -317,6 +467,11 @@ class Content:
 
     category_index: int
 
+    set_id: dataclasses.InitVar[int | None] = None
+
+    _shown: bool = dataclasses.field(default=False, init=False, compare=False)
+    is_wager: bool = dataclasses.field(default=False, init=False, compare=False)
+
     @property
     def id(self):
         return f"{self.category_index}_{self.value}"
@@ -327,10 +482,68 @@ class Content:
         self._shown = True
         return resp
 
-    def __post_init__(self):
-        self._shown = False
-        self.is_wager = False
-        self.year = datetime.datetime.fromisoformat(self.year).strftime("%Y")
+    def __post_init__(self, set_id: int | None):
+        self.answer, self.question, self.year = clue(set_id, self.answer, self.question, self.year)
+
+
+def fetch(settings: dict) -> tuple[typing.Any, str]:
+    """Build a game, returning either its data, or the message explaining why it couldn't be made. The game is built
+    in-process when this server is also serving the API, and is only requested over HTTP when the API is elsewhere.
+
+    Required Arguments:
+
+    settings (dict) -- The parameters of the game (the same as those of the API's request)
+    """
+    if remote_api() or not flask.has_app_context():
+        return request_game(settings)
+
+    try:
+        return games.serialize(games.build(settings)), ""
+
+    except games.GameError as error:
+        return None, str(error)
+
+
+def remote_api() -> bool:
+    """Whether the API endpoint is on a different host (or port) to this server."""
+    url = urllib.parse.urlsplit(config.api_endpoint)
+
+    return url.hostname not in LOCAL_HOSTS or str(url.port or DEFAULT_PORTS.get(url.scheme)) != str(config.port)
+
+
+def request_game(settings: dict) -> tuple[typing.Any, str]:
+    """Request a game from the API over HTTP, returning either its data, or the message explaining why it couldn't be
+    made.
+
+    Required Arguments:
+
+    settings (dict) -- The parameters of the request
+    """
+    params = urllib.parse.urlencode(settings, doseq=True)
+
+    try:
+        api_data = urllib.request.urlopen(f"{config.api_endpoint}?{params}")
+
+        game = json.loads(api_data.read().decode("utf-8"))
+
+        if isinstance(game, dict) and (error := game.get("message")):
+            return None, error
+
+        return game, ""
+
+    except urllib.error.HTTPError as error_data:
+        if error_data.code == 400:
+            data = json.loads(error_data.read().decode("utf-8"))
+
+            return None, data["message"]
+
+        elif error_data.code == 404:
+            return None, (
+                "An error occurred finding the API. Please try restarting the server, or check your configuration."
+            )
+
+        else:
+            return None, "An unknown error occurred. Please submit a bug report with details!"
 
 
 def safe_name(name: str) -> str:
@@ -0,0 +1,224 @@
+"""An optional, in-memory, columnar index of the category (and set) metadata used to build game boards, so choosing the
+categories for a board doesn't need a round trip through SQL. Only the sets of the chosen categories are then loaded
+from the database.
+
+The columns are plain ``array`` objects, ordered by category id. For each combination of round, completeness and
+whether the categories have any external sets, there's also a "view" of the matching categories sorted by year, so that
+filtering by a range of years is a pair of binary searches, rather than a scan.
+"""
+
+import array
+import bisect
+import typing as t
+import weakref
+import itertools
+
+from sqlalchemy import Engine, exists, select
+from sqlalchemy.orm import Session, scoped_session
+
+from jeopardy.api import database
+from jeopardy.api.models import Set, Date, Show, Round, Value, Category
+
+INDEXES: weakref.WeakKeyDictionary[Engine, "ColumnarIndex"] = weakref.WeakKeyDictionary()
+
+View = tuple["array.array[int]", "array.array[int]"]
+
+
+class Candidates(t.Sequence[tuple[int, str]]):
+    """The (id, name) of each category matching a query, without copying them out of the columns.
+
+    Args:
+        columns (ColumnarIndex): the index the positions refer to
+        segments (list[tuple[array.array[int], int, int]]): slices (array, start, stop) of the positions matching
+    """
+
+    def __init__(self, columns: "ColumnarIndex", segments: list[tuple["array.array[int]", int, int]]) -> None:
+        self.columns = columns
+        self.segments = [(positions, start, stop) for positions, start, stop in segments if stop > start]
+        self.offsets = list(itertools.accumulate((stop - start for _, start, stop in self.segments), initial=0))
+
+    def __len__(self) -> int:
+        return self.offsets[-1]
+
+    @t.overload
+    def __getitem__(self, item: int) -> tuple[int, str]: ...
+
+    @t.overload
+    def __getitem__(self, item: slice) -> list[tuple[int, str]]: ...
+
+    def __getitem__(self, item: int | slice) -> tuple[int, str] | list[tuple[int, str]]:
+        if isinstance(item, slice):
+            return [self[i] for i in range(*item.indices(len(self)))]
+
+        if not 0 <= item < len(self):
+            raise IndexError("candidate index out of range")
+
+        segment = bisect.bisect_right(self.offsets, item) - 1
+        positions, start, _ = self.segments[segment]
+        position = positions[start + item - self.offsets[segment]]
+
+        return self.columns.ids[position], self.columns.names[position]
+
+
+class ColumnarIndex:
+    """Columns of the category metadata needed to choose the categories for a board.
+
+    Args:
+        session (Session | scoped_session[t.Any]): session used to load the columns
+    """
+
+    def __init__(self, session: Session | scoped_session[t.Any]) -> None:
+        self.ids = array.array("q")
+        self.rounds = array.array("b")
+        self.years = array.array("h")
+        self.complete = array.array("b")
+        self.external = array.array("l")
+        self.shows = array.array("q")
+        self.show_ids = array.array("q")
+        self.names: list[str] = []
+
+        # The sets of the category at position ``i`` are ``set_ids[set_offsets[i]:set_offsets[i + 1]]``
+        self.set_ids = array.array("q")
+        self.set_offsets = array.array("q", [0])
+
+        # Like the category summaries, only categories with any sets can be put on a board
+        year = database.table(Date).c.year
+        categories = (
+            select(Category.id, Category.name, Round.number, year, Category.complete, Show.number, Show.id)
+            .join(Round, Round.id == Category.round_id)
+            .join(Date, Date.id == Category.date_id)
+            .join(Show, Show.id == Category.show_id)
+            .where(exists().where(Set.category_id == Category.id))
+            .order_by(Category.id)
+        )
+        names: dict[str, str] = {}
+
+        for id, name, round, year, complete, show, show_id in session.execute(categories):
+            self.ids.append(id)
+            self.names.append(names.setdefault(name, name))
+            self.rounds.append(round)
+            self.years.append(year)
+            self.complete.append(complete)
+            self.shows.append(show)
+            self.show_ids.append(show_id)
+            self.external.append(0)
+
+        sets = (
+            select(Set.id, Set.category_id, Set.external)
+            .join(Value, Value.id == Set.value_id)
+            .order_by(Set.category_id, Value.amount, Set.id)
+        )
+        position = 0
+
+        for id, category_id, external in session.execute(sets):
+            while self.ids[position] != category_id:
+                self.set_offsets.append(len(self.set_ids))
+                position += 1
+
+            self.set_ids.append(id)
+            self.external[position] += bool(external)
+
+        self.set_offsets.extend(itertools.repeat(len(self.set_ids), len(self.ids) + 1 - len(self.set_offsets)))
+
+        self.by_show: dict[int, list[int]] = {}
+        self.by_show_id: dict[int, list[int]] = {}
+
+        for position, (show, show_id) in enumerate(zip(self.shows, self.show_ids)):
+            self.by_show.setdefault(show, []).append(position)
+            self.by_show_id.setdefault(show_id, []).append(position)
+
+        self.views: dict[tuple[int, bool, bool], View] = {}
+
+        for position in sorted(range(len(self.ids)), key=lambda i: (self.years[i], self.ids[i])):
+            for allow_incomplete, allow_external in itertools.product((False, True), repeat=2):
+                if (self.complete[position] or allow_incomplete) and (not self.external[position] or allow_external):
+                    key = (self.rounds[position], allow_incomplete, allow_external)
+                    positions, years = self.views.setdefault(key, (array.array("q"), array.array("h")))
+                    positions.append(position)
+                    years.append(self.years[position])
+
+    def candidates(
+        self,
+        rounds: t.Iterable[int],
+        start: int = -1,
+        stop: int = -1,
+        show_number: int = -1,
+        show_id: int = -1,
+        allow_incomplete: bool = False,
+        allow_external: bool = False,
+    ) -> Candidates:
+        """Find the categories matching the same filters as ``GameResource``.
+
+        Args:
+            rounds (t.Iterable[int]): the round numbers to include
+            start (int, optional): the first year to include. Defaults to -1 (no limit).
+            stop (int, optional): the last year to include. Defaults to -1 (no limit).
+            show_number (int, optional): only include categories from this show. Defaults to -1.
+            show_id (int, optional): only include categories from the show with this id. Defaults to -1.
+            allow_incomplete (bool, optional): include incomplete categories. Defaults to False.
+            allow_external (bool, optional): include categories with external sets. Defaults to False.
+
+        Returns:
+            Candidates: the matching categories
+        """
+        rounds = tuple(rounds)
+
+        if show_number != -1 or show_id != -1:
+            shown = self.by_show.get(show_number, []) if show_number != -1 else self.by_show_id.get(show_id, [])
+            matching = array.array(
+                "q",
+                (
+                    position
+                    for position in shown
+                    if self.rounds[position] in rounds
+                    and (self.complete[position] or allow_incomplete)
+                    and (not self.external[position] or allow_external)
+                    and (start == -1 or stop == -1 or start <= self.years[position] <= stop)
+                ),
+            )
+
+            return Candidates(columns=self, segments=[(matching, 0, len(matching))])
+
+        segments = []
+
+        for round in rounds:
+            positions, years = self.views.get((round, allow_incomplete, allow_external), (array.array("q"), []))
+            low, high = 0, len(positions)
+
+            if start != -1 and stop != -1:
+                low, high = bisect.bisect_left(years, start), bisect.bisect_right(years, stop)
+
+            segments.append((positions, low, high))
+
+        return Candidates(columns=self, segments=segments)
+
+    def sets(self, category_ids: t.Iterable[int]) -> list[int]:
+        """Get the ids of the sets in each of the categories."""
+        ids: list[int] = []
+
+        for category_id in category_ids:
+            position = bisect.bisect_left(self.ids, category_id)
+            ids.extend(self.set_ids[self.set_offsets[position] : self.set_offsets[position + 1]])
+
+        return ids
+
+
+def index(engine: Engine, session: Session | scoped_session[t.Any]) -> ColumnarIndex:
+    """Get the columnar index of the database, building it on first use (and after any change to the data).
+
+    Args:
+        engine (Engine): the engine the index is for
+        session (Session | scoped_session[t.Any]): session used to load the columns, if needed
+
+    Returns:
+        ColumnarIndex: the index
+    """
+    if (columns := INDEXES.get(engine)) is None:
+        columns = INDEXES[engine] = ColumnarIndex(session=session)
+
+    return columns
+
+
+@database.changed.connect
+def clear(sender: t.Any, **kwargs: t.Any) -> None:
+    INDEXES.clear()
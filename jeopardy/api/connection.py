@@ -0,0 +1,90 @@
+"""SQLite connection tuning for the API, and a session that sends the reads of ``GET`` requests to a separate read-only
+engine, so that they never queue behind (or hold up) the writes of an ingest.
+"""
+
+import typing as t
+import urllib.parse
+
+from flask import request, has_request_context
+from sqlalchemy import URL, Engine, event, make_url
+from flask_sqlalchemy.session import Session
+
+READ_ONLY = "read_only"
+READ_METHODS = ("GET", "HEAD")
+
+# Pragmas which either can't be, or needn't be, set on a read-only connection (they're persisted in the file)
+WRITE_PRAGMAS = ("journal_mode", "synchronous")
+
+
+def configure(engine: Engine, pragmas: dict[str, t.Any], read_only: bool = False) -> None:
+    """Apply the pragmas to every connection the engine opens.
+
+    Args:
+        engine (Engine): the engine to configure
+        pragmas (dict[str, t.Any]): pragma names and values, e.g., ``config.sqlite_pragmas``
+        read_only (bool, optional): whether the engine opens read-only connections. Defaults to False.
+    """
+    statements = [
+        f"PRAGMA {name} = {value}"
+        for name, value in pragmas.items()
+        if value is not None and not (read_only and name in WRITE_PRAGMAS)
+    ]
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: t.Any, connection_record: t.Any) -> None:
+        cursor = dbapi_connection.cursor()
+
+        for statement in statements:
+            cursor.execute(statement)
+
+        cursor.close()
+
+
+def read_only_url(url: str | URL) -> URL | None:
+    """Get the URL for a read-only connection to the same SQLite file.
+
+    Args:
+        url (str | URL): URL of the database
+
+    Returns:
+        URL | None: the read-only URL, or ``None`` for databases that aren't a file
+    """
+    url = make_url(url)
+
+    if url.get_backend_name() != "sqlite" or url.database in (None, "", ":memory:") or url.query.get("uri"):
+        return None
+
+    path = urllib.parse.quote(str(url.database))
+
+    return url.set(database=f"file:{path}", query={"mode": "ro", "uri": "true"})
+
+
+class RoutingSession(Session):
+    """Session which runs the ``SELECT`` statements of read requests on the read-only engine (when there is one).
+    Once a transaction has written anything, it stays on the primary engine until it ends, so it can read its own
+    writes.
+    """
+
+    def get_bind(self, mapper: t.Any = None, clause: t.Any = None, bind: t.Any = None, **kwargs: t.Any) -> t.Any:
+        if bind is None and self.reading(clause) and (engine := self._db.engines.get(READ_ONLY)) is not None:
+            return engine
+
+        if not getattr(clause, "is_select", False):
+            self.info["writing"] = True
+
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+    def reading(self, clause: t.Any) -> bool:
+        return (
+            getattr(clause, "is_select", False)
+            and not self._flushing
+            and not self.info.get("writing", False)
+            and has_request_context()
+            and request.method in READ_METHODS
+        )
+
+
+@event.listens_for(RoutingSession, "after_transaction_end")
+def transaction_end(session: RoutingSession, transaction: t.Any) -> None:
+    if transaction.parent is None:
+        session.info.pop("writing", None)
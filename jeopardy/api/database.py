@@ -1,13 +1,27 @@
 import zlib
+import typing as t
 import datetime
+import itertools
 
-from sqlalchemy import select
+import sqlalchemy
+from blinker import Namespace, NamedSignal
+from sqlalchemy import Table, Integer, Connection, ColumnElement, cast, func, insert, select, tuple_, update, bindparam
+from sqlalchemy.orm import Session, InstrumentedAttribute, scoped_session
 
 from jeopardy.api import KEYS
-from jeopardy.api.models import Set, Date, Show, Round, Value, Category, db
+from jeopardy.api.models import Set, Base, Date, Show, Round, Value, Category, CategorySummary, db, ordinal, sort_key
 
 session = db.session
 
+signals = Namespace()
+changed: NamedSignal = signals.signal("changed")
+
+BATCH_SIZE = 5000
+CHUNK_SIZE = 250
+
+T = t.TypeVar("T")
+K = t.TypeVar("K", bound=tuple[t.Any, ...])
+
 
 class SetAlreadyExistsError(Exception):
     def __init__(self) -> None:
@@ -30,7 +44,22 @@ class BadDataError(Exception):
         super().__init__(self.message)
 
 
-def add(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Set:
+class Clue(t.NamedTuple):
+    """A validated set, as parsed from the JSON supplied to the API."""
+
+    date: datetime.date
+    show: int
+    round: int
+    complete: bool
+    category: str
+    value: int
+    external: bool
+    answer: str
+    question: str
+    hash: int
+
+
+def parse(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Clue:
     def key(key: str) -> str | bool | int:
         if uses_shortnames:
             return clue_data[key[0].lower() if key.lower() != "complete" else "f"]
@@ -55,20 +84,12 @@ def add(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Set:
     except ValueError:
         raise BadDataError(item="date", error="in the isoformat: YYYY-MM-DD")
 
-    if (date := session.scalar(select(Date).where(Date.date == date_format))) is None:
-        date = Date(date=date_format)
-        db.session.add(date)
-
     try:
         show_format = int(key("show"))
 
     except ValueError:
         raise BadDataError(item="show number", error="an integer (positive or negative)")
 
-    if (show := session.scalar(select(Show).where(Show.number == show_format))) is None:
-        show = Show(number=show_format, date=date)
-        db.session.add(show)
-
     try:
         round_format = int(key("round"))
         if round_format not in (0, 1, 2, 4):
@@ -77,21 +98,9 @@ def add(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Set:
     except ValueError:
         raise BadDataError(item="round number", error="one of the following integers: (0, 1, 2, 4)")
 
-    if (round_ := session.scalar(select(Round).where(Round.number == round_format))) is None:
-        round_ = Round(number=round_format)
-        db.session.add(round_)
-
     if (complete_format := key("complete")) not in (True, False):
         raise BadDataError(item="complete tag", error="supplied with a boolean value")
 
-    if (
-        category := session.scalar(
-            select(Category).where(Category.name == key("category")).where(Category.date == date)
-        )
-    ) is None:
-        category = Category(name=key("category"), show=show, round=round_, complete=complete_format, date=date)
-        db.session.add(category)
-
     try:
         value_format = int(str(key("value")).replace("$", ""))
         if value_format < 0:
@@ -100,32 +109,495 @@ def add(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Set:
     except ValueError:
         raise BadDataError(item="value", error='a positive number, with or without, a "$"')
 
-    if (value := session.scalar(select(Value).where(Value.amount == value_format))) is None:
-        value = Value(amount=value_format, round=round_)
-        db.session.add(value)
-
     if (external_format := key("external")) not in (True, False):
         raise BadDataError(item="external tag", error="supplied with a boolean value")
 
-    hash = zlib.adler32(f'{key("question")}{key("answer")}{show.number}'.encode())
-
-    if session.scalar(select(Set).where(Set.hash == hash)) is None:
-        set_ = Set(
-            category=category,
-            date=date,
-            show=show,
-            round=round_,
-            answer=key("answer"),
-            question=key("question"),
-            value=value,
-            external=external_format,
-            hash=hash,
+    return Clue(
+        date=date_format,
+        show=show_format,
+        round=round_format,
+        complete=bool(complete_format),
+        category=str(key("category")),
+        value=value_format,
+        external=bool(external_format),
+        answer=str(key("answer")),
+        question=str(key("question")),
+        hash=zlib.adler32(f'{key("question")}{key("answer")}{show_format}'.encode()),
+    )
+
+
+def batched(iterable: t.Iterable[T], size: int) -> t.Iterator[tuple[T, ...]]:
+    iterator = iter(iterable)
+
+    while batch := tuple(itertools.islice(iterator, size)):
+        yield batch
+
+
+def table(model: type[Base]) -> Table:
+    return Base.metadata.tables[model.__tablename__]
+
+
+def backfill(connection: Connection) -> None:
+    """Fill in the derived columns (the date ordinals, the sort key of each set, and the position of each category
+    summary) of any row which doesn't have them yet, e.g., those added before the column existed.
+
+    Args:
+        connection (Connection): connection to the database to fill in
+    """
+    dates, rounds, values, categories = table(Date), table(Round), table(Value), table(Category)
+    julian = func.julianday(func.printf("%04d-%02d-%02d", dates.c.year, dates.c.month, dates.c.day))
+
+    connection.execute(
+        update(dates)
+        .where(dates.c.ordinal.is_(None))
+        .values(ordinal=cast(julian - func.julianday("1970-01-01"), Integer))
+    )
+
+    for model in (Category, Set):
+        rows = table(model)
+        date_ordinal = select(dates.c.ordinal).where(dates.c.id == rows.c.date_id).scalar_subquery()
+
+        connection.execute(update(rows).where(rows.c.date_ordinal.is_(None)).values(date_ordinal=date_ordinal))
+
+    sets = table(Set)
+    key = (
+        select(
+            func.printf(
+                "%04d-%02d-%02d%d%s\x1f%010d",
+                dates.c.year,
+                dates.c.month,
+                dates.c.day,
+                rounds.c.number,
+                categories.c.name,
+                values.c.amount,
+            )
+        )
+        .where(dates.c.id == sets.c.date_id)
+        .where(rounds.c.id == sets.c.round_id)
+        .where(categories.c.id == sets.c.category_id)
+        .where(values.c.id == sets.c.value_id)
+        .scalar_subquery()
+    )
+
+    connection.execute(update(sets).where(sets.c.sort_key.is_(None)).values(sort_key=key))
+
+    summaries = table(CategorySummary)
+
+    if connection.scalar(select(select(summaries).where(summaries.c.position.is_(None)).exists())):
+        renumber(connection)
+
+
+def summarize(
+    connection: Connection | Session | scoped_session[t.Any], category_ids: t.Iterable[int] | None = None
+) -> None:
+    """Recount the summary of each category from its sets (dropping the summaries of categories left without any).
+
+    Args:
+        connection (Connection | Session | scoped_session[t.Any]): connection or session to the database to update
+        category_ids (t.Iterable[int] | None, optional): the categories to recount. Defaults to None (all of them).
+    """
+    summaries, sets, categories, rounds = table(CategorySummary), table(Set), table(Category), table(Round)
+
+    counts = (
+        select(
+            sets.c.category_id,
+            rounds.c.number,
+            categories.c.date_ordinal,
+            categories.c.complete,
+            func.count(),
+            func.sum(cast(sets.c.external, Integer)),
+            func.count(sets.c.value_id.distinct()),
         )
+        .join(categories, categories.c.id == sets.c.category_id)
+        .join(rounds, rounds.c.id == categories.c.round_id)
+        .group_by(sets.c.category_id)
+    )
+    columns = [
+        "category_id",
+        "round",
+        "date_ordinal",
+        "complete",
+        "set_count",
+        "external_count",
+        "value_count",
+    ]
+
+    if category_ids is None:
+        connection.execute(sqlalchemy.delete(summaries))
+        connection.execute(insert(summaries).from_select(columns, counts))
+        renumber(connection)
+
+        return
+
+    for chunk in batched(set(category_ids), CHUNK_SIZE):
+        old = connection.execute(
+            select(summaries.c.category_id, summaries.c.round, summaries.c.complete, summaries.c.position).where(
+                summaries.c.category_id.in_(chunk)
+            )
+        ).all()
+
+        connection.execute(sqlalchemy.delete(summaries).where(summaries.c.category_id.in_(chunk)))
+        connection.execute(insert(summaries).from_select(columns, counts.where(sets.c.category_id.in_(chunk))))
+
+        place(connection, chunk, old)
+
+
+def renumber(connection: Connection | Session | scoped_session[t.Any]) -> None:
+    """Number the category summaries of each round and completeness from 0, in order of category id (see
+    ``CategorySummary.position``).
+
+    Args:
+        connection (Connection | Session | scoped_session[t.Any]): connection or session to the database to update
+    """
+    summaries = table(CategorySummary)
+    numbered = select(
+        summaries.c.category_id,
+        func.row_number()
+        .over(partition_by=(summaries.c.round, summaries.c.complete), order_by=summaries.c.category_id)
+        .label("number"),
+    ).subquery()
+
+    connection.execute(
+        update(summaries)
+        .where(summaries.c.category_id == numbered.c.category_id)
+        .values(position=numbered.c.number - 1)
+    )
+
+
+def place(
+    connection: Connection | Session | scoped_session[t.Any],
+    category_ids: t.Iterable[int],
+    old: t.Sequence[tuple[int, int, bool, int | None]],
+) -> None:
+    """Position the recounted summaries of some categories, so the positions of each round and completeness stay
+    without any gaps. A category keeps its position if it's still in the same group, others take the positions freed by
+    the categories which left the group (or go at the end), and any positions still free are filled by moving the last
+    category of the group into them.
+
+    Args:
+        connection (Connection | Session | scoped_session[t.Any]): connection or session to the database to update
+        category_ids (t.Iterable[int]): the categories whose summaries were recounted
+        old (t.Sequence[tuple[int, int, bool, int | None]]): the (category id, round, complete, position) of their
+            summaries before they were recounted
+    """
+    summaries = table(CategorySummary)
+
+    new = connection.execute(
+        select(summaries.c.category_id, summaries.c.round, summaries.c.complete).where(
+            summaries.c.category_id.in_(category_ids)
+        )
+    ).all()
+
+    before = {category_id: ((round, bool(complete)), position) for category_id, round, complete, position in old}
+    after = {category_id: (round, bool(complete)) for category_id, round, complete in new}
+
+    for group in sorted(set(after.values()) | {group for group, _ in before.values()}):
+        in_group = [summaries.c.round == group[0], summaries.c.complete == group[1]]
+
+        kept = {
+            category_id: position
+            for category_id, (previous, position) in before.items()
+            if previous == group and after.get(category_id) == group and position is not None
+        }
+        freed = {position for previous, position in before.values() if previous == group and position is not None}
+        holes = sorted(freed - set(kept.values()))
+
+        end = connection.scalar(select(func.max(summaries.c.position)).where(*in_group))
+        size = max(-1 if end is None else end, *freed, -1) + 1
+        positions = []
+
+        for category_id in (category_id for category_id, current in after.items() if current == group):
+            if (position := kept.get(category_id)) is None:
+                position = holes.pop(0) if holes else size
+                size = max(size, position + 1)
+
+            positions.append({"b_category_id": category_id, "b_position": position})
 
-        db.session.add(set_)
-        db.session.commit()
+        if positions:
+            connection.execute(
+                update(summaries)
+                .where(summaries.c.category_id == bindparam("b_category_id"))
+                .values(position=bindparam("b_position")),
+                positions,
+            )
 
-        return set_
+        while holes:
+            size -= 1
 
-    else:
+            if size in holes:
+                holes.remove(size)
+
+            else:
+                connection.execute(
+                    update(summaries).where(*in_group, summaries.c.position == size).values(position=holes.pop(0))
+                )
+
+
+def add(clue_data: dict[str, str | bool | int], uses_shortnames: bool) -> Set:
+    (result,) = Loader(session=session).insert([parse(clue_data=clue_data, uses_shortnames=uses_shortnames)])
+
+    if result["status"] == "duplicate":
         raise SetAlreadyExistsError()
+
+    session.commit()
+    changed.send(session)
+
+    return t.cast(Set, session.get(Set, result["id"]))
+
+
+def delete(id: int) -> bool:
+    """Delete a single set from the database.
+
+    Args:
+        id (int): ID of the set to delete
+
+    Returns:
+        bool: whether there was a set to delete
+    """
+    if (row := session.get(Set, id)) is None:
+        return False
+
+    session.delete(row)
+    session.flush()
+    summarize(session, category_ids=[row.category_id])
+    session.commit()
+    changed.send(session)
+
+    return True
+
+
+def add_many(
+    rows: t.Iterable[t.Any], uses_shortnames: bool, batch_size: int = BATCH_SIZE
+) -> t.Iterator[dict[str, t.Any]]:
+    """Validate and insert any number of sets, committing once per batch. Rows which fail validation, or which are
+    already in the database, are reported without aborting the rest of the batch.
+
+    Args:
+        rows (t.Iterable[t.Any]): the JSON data for each set
+        uses_shortnames (bool): whether the keys are the single letter abbreviations
+        batch_size (int, optional): number of sets to insert per transaction. Defaults to BATCH_SIZE.
+
+    Yields:
+        dict[str, t.Any]: the result for each row, in order, with a ``status`` of "inserted", "duplicate", or "error"
+    """
+    loader = Loader(session=session)
+
+    for batch in batched(rows, batch_size):
+        results = loader.add(rows=batch, uses_shortnames=uses_shortnames)
+        session.commit()
+        changed.send(session)
+
+        yield from results
+
+
+class Loader:
+    """Inserts sets in bulk, resolving their dates, shows, rounds, values, and categories with in-memory lookup maps so
+    each batch needs only a handful of statements, rather than several per set.
+
+    Args:
+        session (Session | scoped_session[t.Any]): session to insert with
+        summaries (bool, optional): recount the category summaries after each batch, rather than leaving it to a
+            rebuild once the load is done. Defaults to True.
+    """
+
+    def __init__(self, session: Session | scoped_session[t.Any], summaries: bool = True) -> None:
+        self.session = session
+        self.summaries = summaries
+        self.preloaded = False
+
+        self.rounds: dict[tuple[int], int] = {}
+        self.dates: dict[tuple[int, int, int], int] = {}
+        self.shows: dict[tuple[int], int] = {}
+        self.values: dict[tuple[int], int] = {}
+        self.categories: dict[tuple[str, int], int] = {}
+
+    def preload(self) -> None:
+        """Fill every lookup map with the full contents of its table, so no further lookups are needed for the rest of
+        the load. Only valid while nothing else is writing to the database.
+        """
+        self.rounds.update({(number,): id for id, number in self.session.execute(select(Round.id, Round.number))})
+        self.shows.update({(number,): id for id, number in self.session.execute(select(Show.id, Show.number))})
+        self.values.update({(amount,): id for id, amount in self.session.execute(select(Value.id, Value.amount))})
+        self.dates.update(
+            {
+                (year, month, day): id
+                for id, year, month, day in self.session.execute(
+                    select(Date.id, *table(Date).c["year", "month", "day"])
+                )
+            }
+        )
+        self.categories.update(
+            {
+                (name, date_id): id
+                for id, name, date_id in self.session.execute(select(Category.id, Category.name, Category.date_id))
+            }
+        )
+
+        self.preloaded = True
+
+    def add(self, rows: t.Sequence[t.Any], uses_shortnames: bool) -> list[dict[str, t.Any]]:
+        """Validate and insert a batch of sets, without committing. Rows which fail validation are reported rather than
+        raising.
+
+        Args:
+            rows (t.Sequence[t.Any]): the JSON data for each set
+            uses_shortnames (bool): whether the keys are the single letter abbreviations
+
+        Returns:
+            list[dict[str, t.Any]]: the result for each row, in order
+        """
+        results: list[dict[str, t.Any]] = [{}] * len(rows)
+        clues: list[tuple[int, Clue]] = []
+
+        for index, row in enumerate(rows):
+            try:
+                if not isinstance(row, dict):
+                    raise BadDataError(item="set", error="a JSON object")
+
+                clues.append((index, parse(clue_data=row, uses_shortnames=uses_shortnames)))
+
+            except (MissingDataError, BadDataError) as exc:
+                results[index] = {"status": "error", "message": exc.message}
+
+        for (index, _), result in zip(clues, self.insert([clue for _, clue in clues])):
+            results[index] = result
+
+        return results
+
+    def insert(self, clues: list[Clue]) -> list[dict[str, t.Any]]:
+        """Insert a batch of (already validated) sets, without committing.
+
+        Args:
+            clues (list[Clue]): the sets to insert
+
+        Returns:
+            list[dict[str, t.Any]]: the result for each set, in order
+        """
+        existing: set[int] = set()
+
+        for chunk in batched({clue.hash for clue in clues}, CHUNK_SIZE):
+            existing.update(self.session.scalars(select(Set.hash).where(Set.hash.in_(chunk))))
+
+        results: list[dict[str, t.Any]] = []
+        new: list[Clue] = []
+
+        for clue in clues:
+            if clue.hash in existing:
+                results.append({"status": "duplicate"})
+
+            else:
+                existing.add(clue.hash)
+                results.append({"status": "inserted"})
+                new.append(clue)
+
+        if not new:
+            return results
+
+        self.resolve(self.rounds, Round, (Round.number,), {(clue.round,): {"number": clue.round} for clue in new})
+        self.resolve(
+            self.dates,
+            Date,
+            tuple(table(Date).c["year", "month", "day"]),
+            {
+                (clue.date.year, clue.date.month, clue.date.day): {
+                    "year": clue.date.year,
+                    "month": clue.date.month,
+                    "day": clue.date.day,
+                    "ordinal": ordinal(clue.date),
+                }
+                for clue in reversed(new)
+            },
+        )
+        self.resolve(
+            self.shows,
+            Show,
+            (Show.number,),
+            {(clue.show,): {"number": clue.show, "date_id": self.date_id(clue)} for clue in reversed(new)},
+        )
+        self.resolve(
+            self.values,
+            Value,
+            (Value.amount,),
+            {(clue.value,): {"amount": clue.value, "round_id": self.rounds[(clue.round,)]} for clue in reversed(new)},
+        )
+        self.resolve(
+            self.categories,
+            Category,
+            (Category.name, Category.date_id),
+            {
+                (clue.category, self.date_id(clue)): {
+                    "name": clue.category,
+                    "show_id": self.shows[(clue.show,)],
+                    "date_id": self.date_id(clue),
+                    "round_id": self.rounds[(clue.round,)],
+                    "date_ordinal": ordinal(clue.date),
+                    "complete": clue.complete,
+                }
+                for clue in reversed(new)
+            },
+        )
+
+        ids = iter(
+            self.session.scalars(
+                insert(table(Set)).returning(table(Set).c.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "category_id": self.categories[(clue.category, self.date_id(clue))],
+                        "date_id": self.date_id(clue),
+                        "show_id": self.shows[(clue.show,)],
+                        "round_id": self.rounds[(clue.round,)],
+                        "value_id": self.values[(clue.value,)],
+                        "date_ordinal": ordinal(clue.date),
+                        "sort_key": sort_key(clue.date, clue.round, clue.category, clue.value),
+                        "external": clue.external,
+                        "hash": clue.hash,
+                        "answer": clue.answer,
+                        "question": clue.question,
+                    }
+                    for clue in new
+                ],
+            ).all()
+        )
+
+        for result in results:
+            if result["status"] == "inserted":
+                result["id"] = next(ids)
+
+        if self.summaries:
+            summarize(self.session, category_ids={self.categories[(clue.category, self.date_id(clue))] for clue in new})
+
+        return results
+
+    def date_id(self, clue: Clue) -> int:
+        return self.dates[(clue.date.year, clue.date.month, clue.date.day)]
+
+    def resolve(
+        self,
+        cache: dict[K, int],
+        model: type[Round | Date | Show | Value | Category],
+        columns: tuple[ColumnElement[t.Any] | InstrumentedAttribute[t.Any], ...],
+        wanted: dict[K, dict[str, t.Any]],
+    ) -> None:
+        """Fill the lookup map for a dimension with the ID of every wanted key, first from the database, and then by
+        inserting the rows that are still missing.
+
+        Args:
+            cache (dict[K, int]): lookup map from the natural key to the row ID
+            model (type[Round | Date | Show | Value | Category]): the dimension model
+            columns (tuple[ColumnElement[t.Any] | InstrumentedAttribute[t.Any], ...]): the columns making up the
+                natural key
+            wanted (dict[K, dict[str, t.Any]]): each needed key, and the values to insert if it doesn't yet exist
+        """
+        missing = [key for key in wanted if key not in cache]
+
+        for chunk in batched(missing if not self.preloaded else (), CHUNK_SIZE):
+            for row in self.session.execute(select(model.id, *columns).where(tuple_(*columns).in_(chunk))):
+                cache.setdefault(t.cast(K, tuple(row[1:])), row[0])
+
+        if missing := [key for key in missing if key not in cache]:
+            ids = self.session.scalars(
+                insert(table(model)).returning(table(model).c.id, sort_by_parameter_order=True),
+                [wanted[key] for key in missing],
+            ).all()
+
+            cache.update(zip(missing, ids))
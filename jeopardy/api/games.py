@@ -0,0 +1,350 @@
+"""Builds the categories (and sets) for game boards. This is the service behind the ``/game`` route of the API, which
+the game server also calls directly, rather than over HTTP, whenever the API is served by the same process.
+"""
+
+import bisect
+import random
+import typing as t
+import itertools
+
+from flask import current_app
+from sqlalchemy import ColumnElement, func, select, literal, union_all
+from werkzeug.datastructures import MultiDict
+
+from jeopardy.api import columnar
+from jeopardy.api.models import Set, Date, Show, Value, Category, CategorySummary, db, on_dates
+from jeopardy.api.schemas import ApiJSONProvider, loading_plan
+
+session = db.session
+
+ROUND_MESSAGE = "The round number must be one of 0 (Jeopardy!), 1 (Double Jeopardy!), or 2 (Final Jeopardy!)"
+
+# SQLite's default limit on the number of SELECTs in a compound statement is 500
+MAX_PROBES = 250
+SAMPLE_ATTEMPTS = 3
+
+Game = list[dict[str, t.Any]]
+
+
+class GameError(ValueError):
+    """The game couldn't be built with the settings given, e.g., as too few categories match them."""
+
+
+def build(settings: t.Mapping[str, t.Any]) -> Game | list[Game]:
+    """Randomly choose the categories for a game, and load them along with their sets.
+
+    Args:
+        settings (t.Mapping[str, t.Any]): the parameters of the game, the same as those of the ``/game`` route (e.g.,
+            its query string), where "rounds" is a comma separated list of the rounds to build a board for, and
+            "exclude" the names of any categories to leave out
+
+    Raises:
+        GameError: the settings are invalid, or too few categories match them
+
+    Returns:
+        Game | list[Game]: each category, and its sets, or, when "rounds" is given, a list of those for each round
+    """
+    size = int(settings.get("size", 6))
+    start = int(settings.get("start", -1))
+    stop = int(settings.get("stop", -1))
+
+    show_number = int(settings.get("show_number", -1))
+    show_id = int(settings.get("show_id", -1))
+
+    round = int(settings.get("round", -1))
+
+    allow_external = bool(settings.get("allow_external", False))
+    allow_incomplete = bool(settings.get("allow_incomplete", False))
+
+    # Names of categories which mustn't be chosen, e.g., as they've already been played in the same room
+    if isinstance(settings, MultiDict):
+        exclude = set(settings.getlist("exclude"))
+
+    elif isinstance(names := settings.get("exclude", ()), str):
+        exclude = {names}
+
+    else:
+        exclude = set(names)
+
+    if not 0 <= round <= 2 and round != -1:
+        raise GameError(ROUND_MESSAGE)
+
+    if show_number != -1 and show_id != -1:
+        raise GameError("Only one of Show Number or Show ID can be supplied at a time.")
+
+    if start != -1 and stop != -1 and (error := Date.valid_inputs(start=start, stop=stop)):
+        raise GameError(error)
+
+    boards: list[tuple[tuple[int, ...], int]]
+
+    if "rounds" in settings:
+        if "round" in settings:
+            raise GameError("Only one of Round or Rounds can be supplied at a time.")
+
+        try:
+            numbers = [int(number) for number in str(settings["rounds"]).split(",")]
+
+        except ValueError:
+            raise GameError(ROUND_MESSAGE)
+
+        if not all(0 <= number <= 2 for number in numbers):
+            raise GameError(ROUND_MESSAGE)
+
+        # The Final Jeopardy! round is only ever a single category
+        boards = [((number,), 1 if number == 2 else size) for number in numbers]
+
+    else:
+        boards = [((0, 1) if round == -1 else (round,), size)]
+
+    columnar_games = current_app.config.get("COLUMNAR_GAMES", False)
+    selected: dict[str, int] = dict.fromkeys(exclude, 0)
+
+    for rounds, count in boards:
+        results: t.Sequence[tuple[int, str]]
+
+        if columnar_games:
+            columns = columnar.index(engine=db.engine, session=session)
+            results = columns.candidates(
+                rounds=rounds,
+                start=start,
+                stop=stop,
+                show_number=show_number,
+                show_id=show_id,
+                allow_incomplete=allow_incomplete,
+                allow_external=allow_external,
+            )
+
+        else:
+            conditions = eligible(rounds, allow_incomplete, allow_external)
+
+            # Without a date or show to narrow them down, the eligible categories could be most of the corpus, so
+            # rather than loading all of them, try drawing a random few first
+            if not ((start != -1 and stop != -1) or show_number != -1 or show_id != -1):
+                picked = sample(rounds, allow_incomplete, allow_external, count, selected)
+
+                if picked is not None:
+                    selected.update(picked)
+
+                    continue
+
+            categories = (
+                select(Category.id, Category.name)
+                .join(CategorySummary, CategorySummary.category_id == Category.id)
+                .where(*conditions)
+            )
+
+            if (start != -1) and (stop != -1):
+                categories = categories.where(on_dates(CategorySummary.date_ordinal, {"start": start, "stop": stop}))
+
+            if show_number != -1:
+                categories = categories.join(Show, Show.id == Category.show_id).where(Show.number == show_number)
+
+            elif show_id != -1:
+                categories = categories.where(Category.show_id == show_id)
+
+            results = [(id, name) for id, name in session.execute(categories.order_by(CategorySummary.category_id))]
+
+        choose(results, count, selected)
+
+    ids = [category_id for name, category_id in selected.items() if name not in exclude]
+    game = build_game(ids, set_ids=columns.sets(ids) if columnar_games else None)
+
+    if "rounds" not in settings:
+        return game
+
+    offsets = list(itertools.accumulate((count for _, count in boards), initial=0))
+
+    return [game[first:last] for first, last in itertools.pairwise(offsets)]
+
+
+def serialize(game: Game | list[Game]) -> list[t.Any]:
+    """Convert a game (or the games of several rounds) to the same plain data the ``/game`` route responds with,
+    without encoding it as JSON.
+
+    Args:
+        game (Game | list[Game]): the output of ``build``
+
+    Returns:
+        list[t.Any]: the serialized game
+    """
+    return [
+        (
+            serialize(board)
+            if isinstance(board, list)
+            else {
+                "category": ApiJSONProvider.default(board["category"]),
+                "sets": [ApiJSONProvider.default(set_) for set_ in board["sets"]],
+            }
+        )
+        for board in game
+    ]
+
+
+def eligible(rounds: tuple[int, ...], allow_incomplete: bool, allow_external: bool) -> list[ColumnElement[bool]]:
+    """Build the filters on ``CategorySummary`` for the categories that can be put on a board.
+
+    Args:
+        rounds (tuple[int, ...]): the round numbers to include
+        allow_incomplete (bool): include incomplete categories
+        allow_external (bool): include categories with external sets
+
+    Returns:
+        list[ColumnElement[bool]]: the filters
+    """
+    conditions: list[ColumnElement[bool]] = [CategorySummary.round.in_(rounds)]
+
+    if not allow_incomplete:
+        conditions.append(CategorySummary.complete == True)  # noqa: E712
+
+    if not allow_external:
+        conditions.append(CategorySummary.external_count == 0)
+
+    return conditions
+
+
+def sample(
+    rounds: tuple[int, ...], allow_incomplete: bool, allow_external: bool, size: int, selected: dict[str, int]
+) -> dict[str, int] | None:
+    """Randomly pick the categories for a board, by drawing positions uniformly from those numbered (without gaps)
+    among the category summaries of each eligible round and completeness (see ``CategorySummary.position``). Each draw
+    is a single index seek, and they're all sent as one statement, so the cost depends on the size of the board, rather
+    than the number of eligible categories. A category with an external set (when they aren't allowed), or with the
+    same name as one already picked, is skipped, as if it had never been drawn, so every eligible category is as likely
+    to be picked as any other.
+
+    Args:
+        rounds (tuple[int, ...]): the round numbers to include
+        allow_incomplete (bool): include incomplete categories
+        allow_external (bool): include categories with external sets
+        size (int): the number of categories to pick
+        selected (dict[str, int]): the categories already picked for the game, by name, which are skipped
+
+    Returns:
+        dict[str, int] | None: the new picks, by name, or None if too few were found (e.g., as there are only a
+            handful of eligible categories), in which case the caller should sample from all of them instead
+    """
+    groups = [(round, complete) for round in rounds for complete in ((True, False) if allow_incomplete else (True,))]
+    ends = session.execute(
+        select(
+            *(
+                select(func.max(CategorySummary.position))
+                .where(CategorySummary.round == round, CategorySummary.complete == complete)
+                .scalar_subquery()
+                for round, complete in groups
+            )
+        )
+    ).one()
+
+    # The positions of every group, one after the other
+    offsets = list(itertools.accumulate((0 if end is None else end + 1 for end in ends), initial=0))
+    conditions = [] if allow_external else [CategorySummary.external_count == 0]
+
+    drawn: set[int] = set()
+    picked: dict[str, int] = {}
+
+    for _ in range(SAMPLE_ATTEMPTS):
+        draws: list[int] = []
+        wanted = min((size - len(picked)) * 2, MAX_PROBES)
+
+        # Draw without replacement, without listing every position
+        while len(draws) < wanted and len(drawn) < offsets[-1]:
+            if (draw := random.randrange(offsets[-1])) not in drawn:
+                drawn.add(draw)
+                draws.append(draw)
+
+        if not draws:
+            break
+
+        probes = []
+
+        for order, draw in enumerate(draws):
+            index = bisect.bisect_right(offsets, draw) - 1
+            round, complete = groups[index]
+
+            probes.append(
+                select(CategorySummary.category_id, literal(order).label("draw")).where(
+                    CategorySummary.round == round,
+                    CategorySummary.complete == complete,
+                    CategorySummary.position == draw - offsets[index],
+                    *conditions,
+                )
+            )
+
+        found = union_all(*probes).subquery()
+
+        # Take the categories in the order they were drawn, so none is favoured over another, e.g., by its id
+        for category_id, name in session.execute(
+            select(Category.id, Category.name).join(found, found.c.category_id == Category.id).order_by(found.c.draw)
+        ):
+            if name not in selected:
+                picked.setdefault(name, category_id)
+
+            if len(picked) == size:
+                return picked
+
+    return None
+
+
+def choose(results: t.Sequence[tuple[int, str]], size: int, selected: dict[str, int]) -> None:
+    """Randomly pick the categories for a board, skipping any with the same name as one already on the board (or on
+    the other boards of the same game).
+
+    Args:
+        results (t.Sequence[tuple[int, str]]): the (id, name) of each eligible category
+        size (int): the number of categories to pick
+        selected (dict[str, int]): the categories picked so far, by name, which the new picks are added to
+
+    Raises:
+        GameError: too few categories (with different names) were found
+    """
+    if (number_results := len(results)) < size:
+        raise GameError(f"Only {number_results} categories were found.")
+
+    numbers = random.sample(range(0, number_results), min(number_results, size * 2 + len(selected)))
+    drawn = set(numbers)
+    target = len(selected) + size
+
+    while len(selected) < target:
+        if not numbers:
+            # Too many of those drawn shared a name (e.g., with an excluded category), so try all of the others
+            if len(drawn) == number_results:
+                raise GameError(f"Only {number_results} categories were found.")
+
+            numbers = [number for number in range(0, number_results) if number not in drawn]
+            random.shuffle(numbers)
+            drawn.update(numbers)
+
+        category_id, name = results[numbers.pop()]
+        selected.setdefault(name, category_id)
+
+
+def build_game(ids: list[int], set_ids: list[int] | None = None) -> Game:
+    """Loads the chosen categories, and all of their sets, in a fixed number of queries regardless of the board size.
+
+    Args:
+        ids (list[int]): the category IDs to include, in the order they should appear on the board
+        set_ids (list[int] | None, optional): the IDs of the sets in those categories, when they're already known.
+            Defaults to None.
+
+    Returns:
+        Game: each category, and its sets ordered by value
+    """
+    categories = session.scalars(select(Category).where(Category.id.in_(ids)).options(*loading_plan(Category))).all()
+
+    sets: dict[int, list[Set]] = {category_id: [] for category_id in ids}
+
+    for set_ in session.scalars(
+        select(Set)
+        .where(Set.category_id.in_(ids) if set_ids is None else Set.id.in_(set_ids))
+        .join(Value)
+        .options(*loading_plan(Set))
+        .order_by(Set.category_id, Value.amount)
+    ):
+        sets[set_.category_id].append(set_)
+
+    order = {category_id: index for index, category_id in enumerate(ids)}
+
+    return [
+        {"category": category, "sets": sets[category.id]}
+        for category in sorted(categories, key=lambda category: order[category.id])
+    ]
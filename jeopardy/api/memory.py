@@ -0,0 +1,126 @@
+"""Serve the API from an in-memory copy of the database file, for read-mostly deployments (e.g., game servers), so that
+no query has to touch the filesystem.
+
+The file is copied, with SQLite's backup API, into a named shared-cache memory database, which every connection in the
+process then opens. Writes are either rejected (``readonly``), or periodically copied back to the file
+(``writeback``).
+"""
+
+import time
+import atexit
+import pathlib
+import sqlite3
+import resource
+import threading
+import contextlib
+import urllib.parse
+
+from jeopardy.api import database
+
+MODES = ("readonly", "writeback")
+
+# In-memory databases live only as long as a connection to them is open, so keep one open for each file
+DATABASES: dict[pathlib.Path, "MemoryDatabase"] = {}
+
+
+class MemoryDatabase:
+    """An in-memory copy of a SQLite database file.
+
+    Args:
+        path (pathlib.Path): the database file to load
+        mode (str): either "readonly" or "writeback"
+        interval (float, optional): seconds between each write back to the file. Defaults to 60.
+    """
+
+    def __init__(self, path: pathlib.Path, mode: str, interval: float = 60) -> None:
+        if mode not in MODES:
+            raise ValueError(f"The in-memory mode must be one of: {', '.join(MODES)}")
+
+        self.path, self.mode, self.interval = path, mode, interval
+        self.uri = f"file:{urllib.parse.quote(str(path))}?mode=memory&cache=shared"
+
+        start = time.perf_counter()
+
+        self.connection = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+
+        # A connection's context manager only ends its transaction, so close the connections to the file explicitly
+        with contextlib.closing(sqlite3.connect(f"file:{urllib.parse.quote(str(path))}?mode=ro", uri=True)) as disk:
+            disk.backup(self.connection)
+
+        self.load_time = time.perf_counter() - start
+        self.rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+        self.dirty = False
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+
+        if mode == "writeback":
+            database.changed.connect(self.mark, weak=False)
+            atexit.register(self.close)
+            threading.Thread(target=self.run, name=f"writeback:{path.name}", daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"sqlite:///{self.uri}&uri=true"
+
+    @property
+    def read_only(self) -> bool:
+        return self.mode == "readonly"
+
+    def report(self) -> str:
+        return f"Loaded {self.path} into memory in {self.load_time:.2f}s (peak RSS: {self.rss / (1 << 20):,.1f} MiB)"
+
+    def mark(self, sender: object = None, **kwargs: object) -> None:
+        self.dirty = True
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            self.flush()
+
+    def flush(self) -> bool:
+        """Copy the in-memory database back to the file, if it has changed since it was last copied.
+
+        Returns:
+            bool: whether the file was written
+        """
+        with self.lock:
+            if not self.dirty:
+                return False
+
+            self.dirty = False
+
+            with contextlib.closing(sqlite3.connect(self.path)) as disk:
+                self.connection.backup(disk)
+
+            return True
+
+    def close(self) -> None:
+        self.stopped.set()
+
+        if self.mode == "writeback":
+            self.flush()
+            database.changed.disconnect(self.mark)
+
+        self.connection.close()
+
+
+def attach(path: pathlib.Path, mode: str, interval: float = 60) -> MemoryDatabase:
+    """Get the in-memory copy of the database file, loading it the first time.
+
+    Args:
+        path (pathlib.Path): the database file
+        mode (str): either "readonly" or "writeback"
+        interval (float, optional): seconds between each write back to the file. Defaults to 60.
+
+    Returns:
+        MemoryDatabase: the in-memory database
+    """
+    if path not in DATABASES:
+        DATABASES[path] = MemoryDatabase(path=path, mode=mode, interval=interval)
+
+    return DATABASES[path]
+
+
+def detach(path: pathlib.Path) -> None:
+    if (memory := DATABASES.pop(path, None)) is not None:
+        memory.close()
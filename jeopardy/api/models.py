@@ -1,15 +1,85 @@
 import typing
+import calendar
 import datetime
 import functools
 import dataclasses
 
-from sqlalchemy import Column, String, Boolean, Integer, ClauseList, ForeignKey, ColumnElement, and_, desc, false
-from sqlalchemy.orm import Mapped, DeclarativeBase, CompositeProperty, synonym, composite, relationship, mapped_column
+from sqlalchemy import Index, String, Boolean, Integer, ForeignKey, ColumnElement, false
+from sqlalchemy.orm import (
+    Mapped,
+    DeclarativeBase,
+    CompositeProperty,
+    InstrumentedAttribute,
+    synonym,
+    composite,
+    relationship,
+    mapped_column,
+)
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.sql.elements import UnaryExpression
 
-db = SQLAlchemy()
+from jeopardy.api.connection import RoutingSession
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
+EPOCH = datetime.date(year=1970, month=1, day=1)
+
+
+def ordinal(date: datetime.date) -> int:
+    """Get the date ordinal (days since 1970-01-01) stored alongside each date, category, and set."""
+    return (date - EPOCH).days
+
+
+def sort_key(date: datetime.date, round: int, category: str, amount: int) -> str:
+    """Get the key stored on each set so the default listing (by date, round, category, and value) can be read straight
+    from an index. The unit separator keeps a category sorting before any longer name it is a prefix of.
+    """
+    return f"{date.isoformat()}{round}{category}\x1f{amount:010d}"
+
+
+def ordinal_range(obj: dict[str, int]) -> tuple[int, int]:
+    """Get the first and last date ordinals covered by a date filter.
+
+    Args:
+        obj (dict[str, int]): either a range of years (``start`` and ``stop``), or a ``year`` with an optional
+            ``month`` and ``day`` (-1 to match any)
+
+    Returns:
+        tuple[int, int]: the first and last ordinal, inclusive
+    """
+    if "start" in obj:
+        return ordinal(datetime.date(obj["start"], 1, 1)), ordinal(datetime.date(obj["stop"], 12, 31))
+
+    year, month, day = obj["year"], obj.get("month", -1), obj.get("day", -1)
+
+    if month < 0:
+        return ordinal(datetime.date(year, 1, 1)), ordinal(datetime.date(year, 12, 31))
+
+    if day < 0:
+        return ordinal(datetime.date(year, month, 1)), ordinal(
+            datetime.date(year, month, calendar.monthrange(year, month)[1])
+        )
+
+    return ordinal(datetime.date(year, month, day)), ordinal(datetime.date(year, month, day))
+
+
+def on_dates(
+    column: ColumnElement[typing.Any] | InstrumentedAttribute[typing.Any], obj: dict[str, int]
+) -> ColumnElement[bool]:
+    """Filter a date ordinal column (e.g., ``Set.date_ordinal``) to a date, month, year, or range of years, as a single
+    range so it can be answered from an index.
+
+    Args:
+        column (ColumnElement[typing.Any] | InstrumentedAttribute[typing.Any]): the date ordinal column
+        obj (dict[str, int]): the date filter, as for ``ordinal_range``
+
+    Returns:
+        ColumnElement[bool]: the filter
+    """
+    first, last = ordinal_range(obj)
+
+    return column == first if first == last else column.between(first, last)
 
 
 class Base(DeclarativeBase):
@@ -23,20 +93,33 @@ class Set(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, info={"serialize": int})
 
-    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False)
-    date_id: Mapped[int] = mapped_column(ForeignKey("date.id"), nullable=False)
-    show_id: Mapped[int] = mapped_column(ForeignKey("show.id"), nullable=False)
-    round_id: Mapped[int] = mapped_column(ForeignKey("round.id"), nullable=False)
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), nullable=False, index=True)
+    date_id: Mapped[int] = mapped_column(ForeignKey("date.id"), nullable=False, index=True)
+    show_id: Mapped[int] = mapped_column(ForeignKey("show.id"), nullable=False, index=True)
+    round_id: Mapped[int] = mapped_column(ForeignKey("round.id"), nullable=False, index=True)
     value_id: Mapped[int] = mapped_column(ForeignKey("value.id"), nullable=False)
 
-    category: Mapped["Category"] = relationship(back_populates="sets", info={"serialize": lambda k: k.name})
-    date: Mapped["Date"] = relationship(back_populates="sets", info={"serialize": lambda k: k.date.isoformat()})
-    show: Mapped["Show"] = relationship(back_populates="sets", info={"serialize": lambda k: k.number})
-    round: Mapped["Round"] = relationship(back_populates="sets", info={"serialize": lambda k: k.number})
-    value: Mapped["Value"] = relationship(back_populates="sets", info={"serialize": lambda k: k.amount})
+    category: Mapped["Category"] = relationship(
+        back_populates="sets", info={"serialize": lambda k: k.name, "column": "category.name"}
+    )
+    date: Mapped["Date"] = relationship(
+        back_populates="sets", info={"serialize": lambda k: k.date.isoformat(), "column": "date.date"}
+    )
+    show: Mapped["Show"] = relationship(
+        back_populates="sets", info={"serialize": lambda k: k.number, "column": "show.number"}
+    )
+    round: Mapped["Round"] = relationship(
+        back_populates="sets", info={"serialize": lambda k: k.number, "column": "round.number"}
+    )
+    value: Mapped["Value"] = relationship(
+        back_populates="sets", info={"serialize": lambda k: k.amount, "column": "value.amount"}
+    )
+
+    date_ordinal: Mapped[typing.Optional[int]] = mapped_column(Integer, index=True)
+    sort_key: Mapped[typing.Optional[str]] = mapped_column(String(150), index=True)
 
     external: Mapped[bool] = mapped_column(Boolean, nullable=False, info={"serialize": bool})
-    complete: Mapped[bool] = synonym("_complete", info={"serialize": bool})
+    complete: Mapped[bool] = synonym("_complete", info={"serialize": bool, "column": "category.complete"})
     hash: Mapped[int] = mapped_column(Integer, nullable=False, unique=True)
 
     answer: Mapped[str] = mapped_column(String(1000), info={"serialize": str})
@@ -58,20 +141,58 @@ class Category(Base):
     name: Mapped[str] = mapped_column(String(100), info={"serialize": str})
 
     show_id: Mapped[int] = mapped_column(ForeignKey("show.id"), nullable=False)
-    date_id: Mapped[int] = mapped_column(ForeignKey("date.id"), nullable=False)
-    round_id: Mapped[int] = mapped_column(ForeignKey("round.id"), nullable=False)
+    date_id: Mapped[int] = mapped_column(ForeignKey("date.id"), nullable=False, index=True)
+    round_id: Mapped[int] = mapped_column(ForeignKey("round.id"), nullable=False, index=True)
+    date_ordinal: Mapped[typing.Optional[int]] = mapped_column(Integer, index=True)
 
-    show: Mapped["Show"] = relationship(back_populates="categories", info={"serialize": lambda k: k.number})
-    date: Mapped["Date"] = relationship(back_populates="categories", info={"serialize": lambda k: k.date.isoformat()})
-    round: Mapped["Round"] = relationship(back_populates="categories", info={"serialize": lambda k: k.number})
+    show: Mapped["Show"] = relationship(
+        back_populates="categories", info={"serialize": lambda k: k.number, "column": "show.number"}
+    )
+    date: Mapped["Date"] = relationship(
+        back_populates="categories", info={"serialize": lambda k: k.date.isoformat(), "column": "date.date"}
+    )
+    round: Mapped["Round"] = relationship(
+        back_populates="categories", info={"serialize": lambda k: k.number, "column": "round.number"}
+    )
 
-    complete: Mapped[bool] = mapped_column(Boolean, nullable=False, info={"serialize": bool})
+    complete: Mapped[bool] = mapped_column(Boolean, nullable=False, index=True, info={"serialize": bool})
     sets: Mapped[list[Set]] = relationship(back_populates="category")
 
     def __repr__(self) -> str:
         return f"<Category {self.name}>"
 
 
+class CategorySummary(Base):
+    """Per category counts, maintained as sets are added and deleted, so choosing the categories for a game board is a
+    lookup on a single indexed table, rather than an aggregate over every set.
+    """
+
+    __tablename__ = "category_summary"
+    __table_args__ = (
+        Index("ix_category_summary_playable", "round", "complete", "external_count", "date_ordinal"),
+        Index("ix_category_summary_position", "round", "complete", "position"),
+    )
+
+    category_id: Mapped[int] = mapped_column(ForeignKey("category.id"), primary_key=True)
+
+    round: Mapped[int] = mapped_column(Integer, nullable=False)
+    date_ordinal: Mapped[typing.Optional[int]] = mapped_column(Integer)
+    complete: Mapped[bool] = mapped_column(Boolean, nullable=False)
+
+    set_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    external_count: Mapped[int] = mapped_column(Integer, nullable=False)
+    value_count: Mapped[int] = mapped_column(Integer, nullable=False)
+
+    # The category's place among those of the same round and completeness, numbered from 0 without any gaps, so a
+    # uniformly random category is a seek to a random position in an index, rather than a full scan
+    position: Mapped[typing.Optional[int]] = mapped_column(Integer)
+
+    category: Mapped[Category] = relationship()
+
+    def __repr__(self) -> str:
+        return f"<CategorySummary {self.category_id}, (Sets={self.set_count}, External={self.external_count})>"
+
+
 @dataclasses.dataclass(order=True)
 class _Date:
     year: int
@@ -84,36 +205,37 @@ class _Date:
     def as_date(self) -> datetime.date:
         return datetime.date(year=self.year, month=self.month, day=self.day)
 
+    @property
+    def ordinal(self) -> int:
+        return ordinal(self.as_date())
+
 
 class _DateComparator(CompositeProperty.Comparator[bool]):
     @functools.cached_property
-    def columns(self) -> dict[str, Column[_Date]]:
-        return {column.key: column for column in self.__clause_element__().clauses}
+    def ordinal(self) -> ColumnElement[typing.Any]:
+        column = self.prop.parent.columns["ordinal"]
+
+        return self.adapter(column) if self.adapter else column
 
     def __eq__(self, obj: typing.Any) -> ColumnElement[bool]:  # type: ignore[override]
         if isinstance(obj, (datetime.date, datetime.datetime)):
             obj = {"year": obj.year, "month": obj.month, "day": obj.day}
 
         if isinstance(obj, dict):
-            if "start" in obj:
-                return and_(obj["start"] <= self.columns["year"], self.columns["year"] <= obj["stop"])
-
-            return and_(
-                *[
-                    obj[key.name] == self.columns[key.name]
-                    for key in dataclasses.fields(_Date)
-                    if obj.get(key.name, -1) >= 0
-                ]
-            )
+            return on_dates(self.ordinal, obj)
 
         return false()
 
-    def desc(self) -> UnaryExpression[bool]:
-        return ClauseList(desc("year"), desc("month"), desc("day"))  # type: ignore[return-value]
+    def asc(self) -> UnaryExpression[typing.Any]:
+        return self.ordinal.asc()
+
+    def desc(self) -> UnaryExpression[typing.Any]:
+        return self.ordinal.desc()
 
 
 class Date(Base):
     __tablename__ = "date"
+    __table_args__ = (Index("ix_date_year_month_day", "year", "month", "day"),)
 
     id: Mapped[int] = mapped_column(primary_key=True)
 
@@ -124,6 +246,8 @@ class Date(Base):
         comparator_factory=_DateComparator,
         info={"serialize": lambda k: k.isoformat()},
     )
+    ordinal: Mapped[typing.Optional[int]] = mapped_column(Integer, index=True)
+
     sets: Mapped[list[Set]] = relationship("Set", back_populates="date")
     shows: Mapped["Show"] = relationship("Show", back_populates="date")
     categories: Mapped[Category] = relationship("Category", back_populates="date")
@@ -165,10 +289,12 @@ class Show(Base):
 
     id: Mapped[int] = mapped_column(primary_key=True, info={"serialize": int})
 
-    number: Mapped[int] = mapped_column(Integer, info={"serialize": int})
+    number: Mapped[int] = mapped_column(Integer, index=True, info={"serialize": int})
     date_id: Mapped[int] = mapped_column(ForeignKey("date.id"))
 
-    date: Mapped["Date"] = relationship(back_populates="shows", info={"serialize": lambda k: k.date.isoformat()})
+    date: Mapped["Date"] = relationship(
+        back_populates="shows", info={"serialize": lambda k: k.date.isoformat(), "column": "date.date"}
+    )
 
     sets: Mapped[list[Set]] = relationship("Set", back_populates="show")
     categories: Mapped[list[Category]] = relationship("Category", back_populates="show")
@@ -201,7 +327,7 @@ class Value(Base):
     __tablename__ = "value"
 
     id: Mapped[int] = mapped_column(primary_key=True)
-    amount: Mapped[int] = mapped_column(Integer, info={"serialize": int})
+    amount: Mapped[int] = mapped_column(Integer, index=True, info={"serialize": int})
     round_id: Mapped[int] = mapped_column(ForeignKey("round.id"), nullable=False)
 
     round: Mapped["Round"] = relationship(back_populates="values")
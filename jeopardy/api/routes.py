@@ -1,17 +1,25 @@
 import re
-import random
+import json
+import base64
 import typing as t
+import weakref
 import functools
+import collections
 
+import sqlalchemy
 from flask import Response, abort
 from flask import jsonify as flask_jsonify
-from flask import request
-from sqlalchemy import Select, or_, func, select
+from flask import request, current_app, stream_with_context
+from sqlalchemy import Engine, Select, ClauseList, ColumnElement, or_, and_, func, true, select, tuple_
 from flask.views import MethodView
 from flask.typing import ResponseReturnValue
+from sqlalchemy.sql import operators
+from werkzeug.exceptions import NotFound
+from sqlalchemy.sql.elements import UnaryExpression
 
-from jeopardy.api import KEYS, bp, database
-from jeopardy.api.models import M, N, Set, Date, Show, Round, Value, Category, db, or_none, or_zero
+from jeopardy.api import KEYS, bp, games, search, database, connection
+from jeopardy.api.models import M, N, Set, Date, Show, Round, Category, db, _Date, or_zero, on_dates
+from jeopardy.api.schemas import RowSerializer, loading_plan, parse_fields, row_serializer
 
 session = db.session
 
@@ -32,14 +40,18 @@ def query_check(model: "M") -> t.Callable[[F], F]:
             else:
                 query = kwargs.copy()  # type: ignore[assignment]
 
-            selection = select(func.count()).select_from(model).filter_by(**query)
-            if db.session.scalar(selection) == 0:
-                abort(
-                    400,
-                    description=f"There is no {model.__name__.lower()} in the database with that {key}.",
-                )
+            # Only an empty result needs explaining, so check the item exists after the fact, rather than beforehand
+            try:
+                return function(*args, **kwargs)
 
-            return function(*args, **kwargs)
+            except NotFound:
+                if not db.session.scalar(select(select(model).filter_by(**query).exists())):
+                    abort(
+                        400,
+                        description=f"There is no {model.__name__.lower()} in the database with that {key}.",
+                    )
+
+                raise
 
         return inner
 
@@ -63,7 +75,13 @@ def validate(model: "M") -> t.Callable[[F], F]:
 class BaseResource(MethodView):
     methods = ["GET", "POST"]
 
+    # Serialize the rows of paginated results straight from SQL (see ``RowSerializer``), rather than loading the models
+    compiled: t.ClassVar[bool] = True
+
     def dispatch_request(self, **kwargs: t.Any) -> ResponseReturnValue:
+        if current_app.config.get("READ_ONLY", False) and request.method not in connection.READ_METHODS:
+            abort(405, description="The database is read only, so no changes can be made.")
+
         try:
             return super().dispatch_request(**kwargs)
         except AssertionError as exc:
@@ -71,55 +89,30 @@ class BaseResource(MethodView):
                 return abort(405, description=str(exc))
             return abort(500, description="An unknown error occurred")
 
+    def paginate(self, model: Select[tuple[N]]) -> ResponseReturnValue:
+        return paginate(model=model, indices=request.args, compiled=self.compiled)
+
 
 class DetailsResource(BaseResource):
     def get(self) -> ResponseReturnValue:
-        categories = {
-            "total": or_zero(session.scalar(select(func.count()).select_from(Category))),
-            "complete": or_zero(session.scalar(select(func.count()).where(Category.complete == True))),  # noqa: E712
-            "incomplete": or_zero(session.scalar(select(func.count()).where(Category.complete == False))),  # noqa: E712
-        }
-        sets = {
-            "total": or_zero(session.scalar(select(func.count()).select_from(Set))),
-            "has_external": or_zero(session.scalar(select(func.count()).where(Set.external == True))),  # noqa: E712
-            "no_external": or_zero(session.scalar(select(func.count()).where(Set.external == True))),  # noqa: E712
-        }
+        if (snapshot := DETAILS.get(db.engine)) is None:
+            snapshot = DETAILS[db.engine] = details()
 
-        shows = {"total": session.scalar(select(func.count()).select_from(Show))}
+        response = jsonify(snapshot)
+        response.add_etag()
+        response.cache_control.no_cache = True
 
-        if 0 in {categories["total"], sets["total"], shows["total"]}:
-            return jsonify()
-
-        shows.update(
-            {
-                "first_id": or_none(session.scalars(select(Show).order_by(Show.id)).first()).id,
-                "last_id": or_none(session.scalars(select(Show).order_by(Show.id.desc())).first()).id,
-                "first_number": or_none(session.scalars(select(Show).order_by(Show.number)).first()).number,
-                "last_number": or_none(session.scalars(select(Show).order_by(Show.number.desc())).first()).number,
-            }
-        )
-
-        air_dates = {
-            "oldest": or_none(session.scalars(select(Date).order_by(Date.date)).first()).date,
-            "most_recent": or_none(session.scalars(select(Date).order_by(Date.date.desc())).first()).date,
-        }
-
-        return jsonify({"categories": categories, "sets": sets, "shows": shows, "air_dates": air_dates})
+        return response.make_conditional(request)
 
 
 class SetById(BaseResource):
     def get(self, id: int) -> ResponseReturnValue:
-        results = select(Set).where(Set.id == id)
+        results = select(Set).where(Set.id == id).options(*loading_plan(Set))
 
         return jsonify(session.scalar(results))
 
     def delete(self, id: int) -> ResponseReturnValue:
-        row = session.scalar(select(Set).filter_by(id=id))
-
-        if row:
-            session.delete(row)
-            session.commit()
-
+        if database.delete(id=id):
             return jsonify({"deleted": id})
 
         return abort(404, description="id could not be found in the database")
@@ -131,57 +124,59 @@ class SetByRound(BaseResource):
     def get(self, number: int) -> ResponseReturnValue:
         results = select(Set).join(Round).where(Round.number == number).order_by(Set.id)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class SetByShowNumber(BaseResource):
     def get(self, number: int) -> ResponseReturnValue:
         results = select(Set).join(Show).where(Show.number == number).order_by(Set.id)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class SetByShowId(BaseResource):
     def get(self, id: int) -> ResponseReturnValue:
         results = select(Set).join(Show).where(Show.id == id).order_by(Set.id)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class SetByDate(BaseResource):
     decorators = [query_check(Date), validate(Date)]
 
     def get(self, year: int, month: int = -1, day: int = -1) -> ResponseReturnValue:
-        results = select(Set).join(Date).where(Date.date == {"year": year, "month": month, "day": day}).order_by(Set.id)
+        results = (
+            select(Set).where(on_dates(Set.date_ordinal, {"year": year, "month": month, "day": day})).order_by(Set.id)
+        )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class SetByYear(BaseResource):
     decorators = [query_check(Date), validate(Date)]
 
     def get(self, start: int, stop: int) -> ResponseReturnValue:
-        results = select(Set).join(Date).where(Date.date == {"start": start, "stop": stop}).order_by(Date.date)
+        results = (
+            select(Set).where(on_dates(Set.date_ordinal, {"start": start, "stop": stop})).order_by(Set.date_ordinal)
+        )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class SetMultiple(BaseResource):
     def get(self) -> ResponseReturnValue:
-        # TODO: Might be able to get rid of id == date_id if back refs are good?
-        results = (
-            select(Set)
-            .join(Date, Date.id == Set.date_id)
-            .join(Round, Round.id == Set.round_id)
-            .join(Category, Category.id == Set.category_id)
-            .join(Value, Value.id == Set.value_id)
-        )
-
-        results = results.order_by(Date.date, Set.round, Category.name, Value.amount)
+        # The sort key orders the sets by date, round, category, and then value, so this is just a walk of its index
+        results = select(Set).order_by(Set.sort_key, Set.id)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
     def post(self) -> ResponseReturnValue:
+        if request.mimetype == "application/x-ndjson":
+            return jsonify(summarize(database.add_many(rows=ndjson(request.stream), uses_shortnames=False)))
+
+        if isinstance(request.json, list):
+            return jsonify(summarize(database.add_many(rows=request.json, uses_shortnames=False)))
+
         payload = t.cast(dict[str, str | int | bool], request.json)
         if (set(payload.keys()) == KEYS) and all((len(str(value)) > 0 for value in payload.values())):
             try:
@@ -196,16 +191,58 @@ class SetMultiple(BaseResource):
             abort(400, description="The question set supplied is missing some data. Every field is required.")
 
 
+class ExportResource(BaseResource):
+    def get(self) -> ResponseReturnValue:
+        output = request.args.get("format", "ndjson").lower()
+
+        if output not in EXPORT_FORMATS:
+            abort(400, description=f"The export format must be one of: {', '.join(EXPORT_FORMATS)}.")
+
+        results = select(Set).where(Set.id > int(request.args.get("after", 0))).order_by(Set.id)
+
+        if (round := int(request.args.get("round", -1))) != -1:
+            if error := Round.valid_inputs(number=round):
+                abort(400, description=error)
+
+            results = results.join(Round, Round.id == Set.round_id).where(Round.number == round)
+
+        if (start := int(request.args.get("start", -1))) != -1 and (stop := int(request.args.get("stop", -1))) != -1:
+            if error := Date.valid_inputs(start=start, stop=stop):
+                abort(400, description=error)
+
+            results = results.where(on_dates(Set.date_ordinal, {"start": start, "stop": stop}))
+
+        if completion := request.args.get("complete", "").lower():
+            if completion not in ("true", "complete", "1", "false", "incomplete", "0"):
+                abort(400, description="The completion status value is invalid")
+
+            results = results.join(Category, Category.id == Set.category_id).where(
+                Category.complete == (completion in ("true", "complete", "1"))
+            )
+
+        try:
+            fields = parse_fields(Set, request.args.get("fields", ""))
+
+        except ValueError as error:
+            abort(400, description=str(error))
+
+        # Always include the id, so that an interrupted export can be resumed with ``after=<the last id received>``
+        serializer = row_serializer(Set, fields=None if fields is None else (*fields, "id"))
+        stream = stream_with_context(export(serializer.select(results), serializer, output))
+
+        return Response(stream, mimetype=EXPORT_FORMATS[output])
+
+
 class ShowById(BaseResource):
     def get(self, id: int) -> ResponseReturnValue:
-        results = select(Show).where(Show.id == id)
+        results = select(Show).where(Show.id == id).options(*loading_plan(Show))
 
         return jsonify(session.scalar(results))
 
 
 class ShowByNumber(BaseResource):
     def get(self, number: int) -> ResponseReturnValue:
-        results = select(Show).where(Show.number == number)
+        results = select(Show).where(Show.number == number).options(*loading_plan(Show))
 
         return jsonify(session.scalar(results))
 
@@ -218,26 +255,26 @@ class ShowByDate(BaseResource):
             select(Show).join(Date).where(Date.date == {"year": year, "month": month, "day": day}).order_by(Show.id)
         )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class ShowByYears(BaseResource):
     decorators = [query_check(Date), validate(Date)]
 
     def get(self, start: int, stop: int) -> ResponseReturnValue:
-        results = select(Show).join(Date).where(Date.date == {"start": start, "stop": stop}).order_by(Date.date)
+        results = select(Show).join(Date).where(Date.date == {"start": start, "stop": stop}).order_by(Date.ordinal)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class ShowMultiple(BaseResource):
     def get(self) -> ResponseReturnValue:
-        return paginate(model=select(Show), indices=request.args)
+        return self.paginate(model=select(Show))
 
 
 class CategoryById(BaseResource):
     def get(self, category_id: int) -> ResponseReturnValue:
-        results = select(Category).where(Category.id == category_id)
+        results = select(Category).where(Category.id == category_id).options(*loading_plan(Category))
 
         return jsonify(session.scalar(results))
 
@@ -246,18 +283,26 @@ class CategoryByDate(BaseResource):
     decorators = [query_check(Date), validate(Date)]
 
     def get(self, year: int, month: int = -1, day: int = -1) -> ResponseReturnValue:
-        results = select(Category).join(Date).where(Date.date == {"year": year, "month": month}).order_by(Category.name)
+        results = (
+            select(Category)
+            .where(on_dates(Category.date_ordinal, {"year": year, "month": month}))
+            .order_by(Category.name)
+        )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryByYears(BaseResource):
     decorators = [query_check(Date), validate(Date)]
 
     def get(self, start: int, stop: int) -> ResponseReturnValue:
-        results = select(Category).join(Date).where(Date.date == {"start": start, "stop": stop}).order_by(Date.date)
+        results = (
+            select(Category)
+            .where(on_dates(Category.date_ordinal, {"start": start, "stop": stop}))
+            .order_by(Category.date_ordinal)
+        )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryByCompletion(BaseResource):
@@ -271,22 +316,34 @@ class CategoryByCompletion(BaseResource):
         else:
             abort(400, description="The completion status value is invalid")
 
-        results = results.join(Date).join(Round).order_by(Date.date, Round.number, Category.name)
+        results = results.join(Round).order_by(Category.date_ordinal, Round.number, Category.name)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryByName(BaseResource):
-    def get(self, name_string: int) -> ResponseReturnValue:
+    def get(self, name_string: str) -> ResponseReturnValue:
         results = (
             select(Category)
-            .where(Category.name.ilike(f"%{name_string}%"))
-            .join(Date)
+            .where(search.category_names(name_string))
             .join(Round)
-            .order_by(Date.date, Round.number, Category.name)
+            .order_by(Category.date_ordinal, Round.number, Category.name)
         )
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
+
+
+class SearchCategory(BaseResource):
+    def get(self, query: str) -> ResponseReturnValue:
+        return self.paginate(model=search.ranked_categories(query))
+
+
+class SearchSet(BaseResource):
+    def get(self, query: str) -> ResponseReturnValue:
+        if not search.phrases(query):
+            abort(400, description="Please provide some text to search for.")
+
+        return self.paginate(model=search.ranked_sets(query))
 
 
 class CategoryByShowNumber(BaseResource):
@@ -295,7 +352,7 @@ class CategoryByShowNumber(BaseResource):
     def get(self, number: int) -> ResponseReturnValue:
         results = select(Category).join(Show).where(Show.number == number).order_by(Category.name)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryByRound(BaseResource):
@@ -304,7 +361,7 @@ class CategoryByRound(BaseResource):
     def get(self, number: int) -> ResponseReturnValue:
         results = select(Category).join(Round).where(Round.number == number).order_by(Category.name)
 
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryByShowId(BaseResource):
@@ -312,117 +369,292 @@ class CategoryByShowId(BaseResource):
 
     def get(self, id: int) -> ResponseReturnValue:
         results = select(Category).join(Show).where(Show.id == id).order_by(Category.name)
-        return paginate(model=results, indices=request.args)
+        return self.paginate(model=results)
 
 
 class CategoryMultiple(BaseResource):
     def get(self) -> ResponseReturnValue:
-        return paginate(model=select(Category), indices=request.args)
+        return self.paginate(model=select(Category))
 
 
 class GameResource(BaseResource):
     def get(self) -> ResponseReturnValue:
-        size = int(request.args.get("size", 6))
-        start = int(request.args.get("start", -1))
-        stop = int(request.args.get("stop", -1))
+        try:
+            game = games.build(request.args)
 
-        show_number = int(request.args.get("show_number", -1))
-        show_id = int(request.args.get("show_id", -1))
+        except games.GameError as error:
+            abort(400, description=str(error))
 
-        round = int(request.args.get("round", -1))
+        return jsonify(game)
 
-        allow_external = bool(request.args.get("allow_external", False))
-        allow_incomplete = bool(request.args.get("allow_incomplete", False))
 
-        if round == -1:
-            categories = select(Category).join(Round).where(or_(Round.number == 0, Round.number == 1))
+EXPORT_BATCH_SIZE = 1000
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "json": "application/json"}
+
+DETAILS: weakref.WeakKeyDictionary[Engine, dict[str, dict[str, t.Any]]] = weakref.WeakKeyDictionary()
+
+
+@database.changed.connect
+def clear_details(sender: t.Any, **kwargs: t.Any) -> None:
+    DETAILS.clear()
+
+
+def details() -> dict[str, dict[str, t.Any]]:
+    """Gathers the summary statistics of the database in a single statement, with one aggregate pass over each table.
+
+    Returns:
+        dict[str, dict[str, t.Any]]: the statistics, or an empty dictionary if the database is empty
+    """
+    columns = Date.__table__.c
+    date = columns.year * 10000 + columns.month * 100 + columns.day
+
+    categories = select(
+        func.count().label("total"), func.count().filter(Category.complete == True).label("complete")  # noqa: E712
+    ).subquery()
+    sets = select(
+        func.count().label("total"), func.count().filter(Set.external == True).label("external")  # noqa: E712
+    ).subquery()
+    shows = select(
+        func.count().label("total"),
+        func.min(Show.id).label("first_id"),
+        func.max(Show.id).label("last_id"),
+        func.min(Show.number).label("first_number"),
+        func.max(Show.number).label("last_number"),
+    ).subquery()
+    dates = select(func.min(date).label("oldest"), func.max(date).label("most_recent")).subquery()
+
+    # Each subquery is a single row, so joining them all together is just one row of every statistic
+    aggregates = categories.join(sets, true()).join(shows, true()).join(dates, true())
+    row = session.execute(select(categories, sets, shows, dates).select_from(aggregates)).one()
+
+    if 0 in {row[0], row[2], row[4]}:
+        return {}
+
+    def as_date(value: int) -> _Date:
+        return _Date(year=value // 10000, month=value // 100 % 100, day=value % 100)
+
+    return {
+        "categories": {"total": row[0], "complete": row[1], "incomplete": row[0] - row[1]},
+        "sets": {"total": row[2], "has_external": row[3], "no_external": row[2] - row[3]},
+        "shows": {
+            "total": row[4],
+            "first_id": row[5],
+            "last_id": row[6],
+            "first_number": row[7],
+            "last_number": row[8],
+        },
+        "air_dates": {"oldest": as_date(row[9]), "most_recent": as_date(row[10])},
+    }
+
+
+def export(
+    model: Select[t.Any], serializer: RowSerializer, output: str, batch_size: int = EXPORT_BATCH_SIZE
+) -> t.Iterator[str]:
+    """Stream the serialized rows of a query, fetching them in batches from the cursor, so the memory used doesn't
+    depend on the number of rows being exported.
+
+    Args:
+        model (Select[t.Any]): the (column) select to export
+        serializer (RowSerializer): serializer for the rows
+        output (str): either "ndjson" (a JSON object per line) or "json" (a single array)
+        batch_size (int, optional): number of rows to fetch at a time. Defaults to EXPORT_BATCH_SIZE.
+
+    Yields:
+        str: chunks of the response body
+    """
+    dumps, started = current_app.json.dumps, False
+    prefix, separator = ("", "\n") if output == "ndjson" else ("[", ",\n")
+
+    for row in session.execute(model.execution_options(yield_per=batch_size)):
+        yield (separator if started else prefix) + dumps(serializer(row))
+        started = True
+
+    if output == "json":
+        yield "]" if started else "[]"
+
+    elif started:
+        yield "\n"
+
+
+def paginate(
+    model: Select[tuple[N]], indices: dict[str, str], missing: str = "", compiled: bool = True
+) -> ResponseReturnValue:
+    if not isinstance(model, Select):
+        model = select(model)
 
-        elif 0 <= round <= 2:
-            categories = select(Category).join(Round).where(Round.number == round)
+    if not model._order_by_clauses:
+        model = model.order_by(*primary_key(model))
 
-        else:
-            message = "The round number must be one of 0 (Jeopardy!), 1 (Double Jeopardy!), or 2 (Final Jeopardy!)"
+    number = min(int(indices.get("number", 100)), 200)
 
-            abort(400, description=message)
+    try:
+        fields = parse_fields(entity(model), indices.get("fields", ""))
 
-        if (start != -1) and (stop != -1):
-            categories = categories.join(Date).where(Date.date == {"start": start, "stop": stop})
+    except ValueError as error:
+        abort(400, description=str(error))
 
-        if show_number != -1 and show_id != -1:
-            abort(400, description="Only one of Show Number or Show ID can be supplied at a time.")
+    # Only the compiled serializer can project a subset of the fields, so it's always used when they're given
+    serializer = row_serializer(entity(model), fields=fields) if compiled or fields else None
 
-        elif show_number != -1:
-            categories = categories.join(Show).where(Show.number == show_number)
+    if "cursor" in indices:
+        return paginate_cursor(model=model, cursor=indices["cursor"], number=number, serializer=serializer)
+
+    counted = model.with_only_columns(*primary_key(model), maintain_column_froms=True).order_by(None)
+
+    if (count := or_zero(session.scalar(select(func.count()).select_from(counted.subquery())))) == 0:
+        return jsonify()
 
-        elif show_id != -1:
-            categories = categories.join(Show).where(Show.id == show_id)
+    start = int(indices.get("start", 0))
 
-        if not allow_incomplete:
-            categories = categories.where(Category.complete == True)  # noqa: E712
+    if start > count:
+        abort(400, description="start number too great")
 
-        if not allow_external:
-            categories = categories.where(select(Set).exists().where(Set.external == False))  # noqa: E712
+    data = fetch(model=model.offset(start).limit(number), serializer=serializer)
 
-        results = session.scalars(categories.order_by(Category.id)).all()
+    return jsonify(
+        {
+            "start": start,
+            "number": number,
+            "data": data,
+            "results": count,
+        }
+    )
 
-        if (number_results := len(results)) < size:
-            abort(400, description=f"Only {number_results} categories were found.")
 
-        numbers = random.sample(range(0, number_results), min(number_results, size * 2))
+def paginate_cursor(
+    model: Select[tuple[N]], cursor: str, number: int, serializer: RowSerializer | None = None
+) -> ResponseReturnValue:
+    """Keyset pagination over the ``ORDER BY`` columns already present on the query. The cursor is an opaque token
+    holding the sort key of the last row of the previous page, so every page costs the same as the first.
 
-        # TODO: Narrow
-        selected: set[str] = set()
-        game: list[dict[str, t.Any]] = []
+    Args:
+        model (Select[tuple[N]]): the ordered query to be paginated
+        cursor (str): the token returned with the previous page, or an empty string for the first page
+        number (int): the number of rows to return
+        serializer (RowSerializer | None, optional): serialize the rows directly, rather than loading the models.
+            Defaults to None.
 
-        while len(game) < size:
-            try:
-                category = results[numbers.pop()]
+    Returns:
+        ResponseReturnValue: the page of data, and the cursor to supply for the next page (or ``None``)
+    """
+    keys, pk = order_keys(model), primary_key(model)
 
-            except IndexError:
-                abort(400, description=f"Only {number_results} categories were found.")
+    if not any(keys[-1][0].compare(column) for column in pk):
+        keys.extend((column, False) for column in pk)
+        model = model.order_by(*pk)
 
-            if category.name not in selected:
-                sets = session.scalars(
-                    select(Set).where(Set.category_id == category.id).join(Value).order_by(Set.value)
-                ).all()
+    if cursor:
+        model = model.where(after_keys(keys, decode_cursor(cursor, length=len(keys))))
 
-                selected.add(category.name)
-                game.append({"category": category, "sets": sets})
+    if serializer is None:
+        model, width = model.options(*loading_plan(entity(model))), 1
 
-        return jsonify(game)
+    else:
+        model, width = serializer.select(model), len(serializer)
 
+    rows = session.execute(model.add_columns(*(column for column, _ in keys)).limit(number + 1)).all()
 
-def paginate(model: Select[tuple[N]], indices: dict[str, str], missing: str = "") -> ResponseReturnValue:
-    if (count := or_zero(session.scalar(select(func.count()).select_from(model.subquery())))) == 0:
+    if not rows:
         return jsonify()
 
-    start = int(indices.get("start", 0))
-    number = min(int(indices.get("number", 100)), 200)
+    return jsonify(
+        {
+            "number": number,
+            "data": [row[0] if serializer is None else serializer(row) for row in rows[:number]],
+            "cursor": encode_cursor(rows[number - 1][width:]) if len(rows) > number else None,
+        }
+    )
 
-    if start > count:
-        abort(400, description="start number too great")
 
-    if not isinstance(model, Select):
-        model = select(model)
+def fetch(model: Select[tuple[N]], serializer: RowSerializer | None) -> list[t.Any]:
+    """Run the query, returning either the models (with the relationships they serialize already loaded) or, when a
+    serializer is given, the serialized rows.
+    """
+    if serializer is None:
+        return list(session.scalars(model.options(*loading_plan(entity(model)))).all())
 
-    rows = session.scalars(model).all()
+    return [serializer(row) for row in session.execute(serializer.select(model))]
 
-    if start + number > count:
-        data = rows[start:]
 
-    else:
-        data = rows[start : start + number]
+def entity(model: Select[tuple[N]]) -> M:
+    return t.cast(M, model.column_descriptions[0]["entity"])
 
-    return jsonify(
-        {
-            "start": start,
-            "number": number,
-            "data": data,
-            "results": count,
-        }
+
+def primary_key(model: Select[tuple[N]]) -> tuple[ColumnElement[t.Any], ...]:
+    return tuple(sqlalchemy.inspect(model.column_descriptions[0]["entity"]).primary_key)
+
+
+def order_keys(model: Select[tuple[N]]) -> list[tuple[ColumnElement[t.Any], bool]]:
+    """Flattens the ``ORDER BY`` clauses of a query (expanding composites like ``Date.date``) into pairs of the sort
+    expression and whether it is sorted in descending order.
+    """
+    keys: list[tuple[ColumnElement[t.Any], bool]] = []
+
+    for clause in model._order_by_clauses:
+        for element in clause.clauses if isinstance(clause, ClauseList) else (clause,):
+            if isinstance(element, UnaryExpression) and element.modifier in (operators.asc_op, operators.desc_op):
+                keys.append((element.element, element.modifier is operators.desc_op))
+
+            else:
+                keys.append((element, False))
+
+    return keys
+
+
+def after_keys(keys: list[tuple[ColumnElement[t.Any], bool]], values: list[t.Any]) -> ColumnElement[bool]:
+    """Builds the ``WHERE`` clause selecting the rows that sort after ``values``. A row-value comparison is used when
+    every key sorts in the same direction, so SQLite can turn it into an index range scan.
+    """
+    columns = [column for column, _ in keys]
+
+    if not any(descending for _, descending in keys):
+        return tuple_(*columns) > tuple_(*values)
+
+    if all(descending for _, descending in keys):
+        return tuple_(*columns) < tuple_(*values)
+
+    return or_(
+        *(
+            and_(*(c == v for c, v in zip(columns[:index], values)), column < value if descending else column > value)
+            for index, ((column, descending), value) in enumerate(zip(keys, values))
+        )
     )
 
 
+def encode_cursor(values: t.Sequence[t.Any]) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode("utf-8")).decode("ascii")
+
+
+def decode_cursor(cursor: str, length: int) -> list[t.Any]:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+
+    except (ValueError, UnicodeError):
+        values = None
+
+    if not isinstance(values, list) or len(values) != length:
+        abort(400, description="The cursor supplied is invalid.")
+
+    return values
+
+
+def ndjson(stream: t.IO[bytes]) -> t.Iterator[t.Any]:
+    for line in stream:
+        if line.strip():
+            try:
+                yield json.loads(line)
+
+            except ValueError:
+                yield None
+
+
+def summarize(results: t.Iterable[dict[str, t.Any]]) -> dict[str, t.Any]:
+    rows = list(results)
+    counts = collections.Counter(row["status"] for row in rows)
+
+    return {"inserted": counts["inserted"], "duplicate": counts["duplicate"], "error": counts["error"], "results": rows}
+
+
 def register_api(view: type[BaseResource], *rules: str, endpoints: tuple[str, ...] = ()) -> None:
     if not endpoints:
         endpoints = (re.sub("(?!^)([A-Z]+)", r"_\1", view.__name__).lower(),)
@@ -512,5 +744,10 @@ register_api(CategoryByRound, "/category/round/<int:number>")
 register_api(CategoryByShowNumber, "/category/show/number/<int:number>")
 register_api(CategoryByShowId, "/category/show/id/<int:id>")
 
+register_api(SearchCategory, "/search/category/<query>")
+register_api(SearchSet, "/search/set/<query>")
+
+register_api(ExportResource, "/export")
+
 register_api(DetailsResource, "/details")
 register_api(GameResource, "/game")
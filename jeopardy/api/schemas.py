@@ -2,24 +2,31 @@ import typing as t
 from functools import lru_cache
 
 import sqlalchemy
+from sqlalchemy import Select, ColumnElement
+from sqlalchemy.orm import CompositeProperty, aliased, joinedload, selectinload
 from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.sql.base import ExecutableOption
 from sqlalchemy.orm.mapper import Mapper
 
-from jeopardy.api.models import Q, Base
+from jeopardy.api.models import Base
 
 
-@lru_cache
-def schema_keys(model: type[Q]) -> list[tuple[str, t.Callable[[Q], t.Any]]]:
+def schema_keys(model: type[Base] | Base) -> list[tuple[str, t.Callable[[t.Any], t.Any]]]:
     """Get the name and serialization function for each column, which is intended to be included in the JSON data, for
     a particular model.
 
     Args:
-        model (type[Q]): model to be serialized
+        model (type[Base] | Base): model (or an instance of it) to be serialized
 
     Returns:
-        list[tuple[str, t.Callable[[Q], t.Any]]]: names (keys) and serialization functions
+        list[tuple[str, t.Callable[[t.Any], t.Any]]]: names (keys) and serialization functions
     """
-    mapper: Mapper[Q] = sqlalchemy.inspect(model, raiseerr=True).mapper
+    return _schema_keys(model if isinstance(model, type) else type(model))
+
+
+@lru_cache
+def _schema_keys(model: type[Base]) -> list[tuple[str, t.Callable[[t.Any], t.Any]]]:
+    mapper: Mapper[Base] = sqlalchemy.inspect(model, raiseerr=True)
 
     response = []
 
@@ -28,12 +35,145 @@ def schema_keys(model: type[Q]) -> list[tuple[str, t.Callable[[Q], t.Any]]]:
             response.append((attr.key, func))
             continue
 
-        if func := getattr(type(model), attr.key).info.get("serialize", None):
+        if func := getattr(model, attr.key).info.get("serialize", None):
             response.append((attr.key, func))
 
     return response
 
 
+@lru_cache
+def loading_plan(model: type[Base]) -> tuple[ExecutableOption, ...]:
+    """Build the loader options that eagerly load every relationship the serializer will touch for a model, so that
+    serializing a page of results doesn't need a query per row (and per relationship).
+
+    Args:
+        model (type[Base]): model being selected
+
+    Returns:
+        tuple[ExecutableOption, ...]: options to apply to the select, i.e.,
+            ``select(model).options(*loading_plan(model))``
+    """
+    keys = {key for key, _ in schema_keys(model)}
+    mapper: Mapper[Base] = sqlalchemy.inspect(model, raiseerr=True)
+
+    return tuple(
+        (selectinload if relationship.uselist else joinedload)(getattr(model, relationship.key))
+        for relationship in mapper.relationships
+        if relationship.key in keys
+    )
+
+
+class RowSerializer:
+    """Serializes a model straight from the columns of a SQL result row, rather than from hydrated ORM objects. The
+    columns (including those of related models, which are pulled in with outer joins) are worked out once, from the
+    same ``info`` metadata that ``schema_keys`` uses, so the output is identical to that of ``ApiJSONProvider``.
+
+    Args:
+        model (type[Base]): model to be serialized
+        fields (tuple[str, ...] | None, optional): only select (and serialize) these keys. Defaults to all of them.
+    """
+
+    def __init__(self, model: type[Base], fields: tuple[str, ...] | None = None) -> None:
+        self.model = model
+
+        mapper: Mapper[Base] = sqlalchemy.inspect(model, raiseerr=True)
+        aliases: dict[str, t.Any] = {}
+
+        self.joins: list[tuple[t.Any, t.Any]] = []
+        self.columns: list[ColumnElement[t.Any]] = []
+        self.fields: list[tuple[str, t.Callable[[t.Sequence[t.Any]], t.Any]]] = []
+
+        for key, func in schema_keys(model):
+            if fields is not None and key not in fields:
+                continue
+
+            if path := mapper.attrs[key].info.get("column"):
+                name, attribute = path.split(".")
+                relationship = mapper.relationships[name]
+                target = relationship.mapper.class_
+
+                if name not in aliases:
+                    aliases[name] = aliased(target)
+                    self.joins.append((aliases[name], getattr(model, name).of_type(aliases[name])))
+
+                prop, func = relationship.mapper.attrs[attribute], getattr(target, attribute).info["serialize"]
+                expression = getattr(aliases[name], attribute)
+
+            else:
+                prop, expression = mapper.attrs[key], getattr(model, key)
+
+            self.fields.append((key, self.getter(prop, expression, func)))
+
+    def getter(
+        self, prop: t.Any, expression: t.Any, func: t.Callable[[t.Any], t.Any]
+    ) -> t.Callable[[t.Sequence[t.Any]], t.Any]:
+        start = len(self.columns)
+
+        if isinstance(prop, CompositeProperty):
+            self.columns.extend(expression.__clause_element__().clauses)
+            cls, stop = prop.composite_class, len(self.columns)
+
+            return lambda row: func(cls(*row[start:stop]))
+
+        self.columns.append(expression)
+
+        return lambda row: func(row[start])
+
+    def select(self, query: Select[t.Any]) -> Select[t.Any]:
+        """Swap the entity being selected for the columns needed to serialize it, keeping the query's own joins,
+        filters and ordering.
+
+        Args:
+            query (Select[t.Any]): a select of the model
+
+        Returns:
+            Select[t.Any]: the select of just the columns
+        """
+        query = query.with_only_columns(*self.columns, maintain_column_froms=True)
+
+        for target, onclause in self.joins:
+            query = query.outerjoin(target, onclause)
+
+        return query
+
+    def __call__(self, row: t.Sequence[t.Any]) -> dict[str, t.Any]:
+        return {key: get(row) for key, get in self.fields}
+
+    def __len__(self) -> int:
+        return len(self.columns)
+
+
+@lru_cache
+def row_serializer(model: type[Base], fields: tuple[str, ...] | None = None) -> RowSerializer:
+    return RowSerializer(model, fields=None if fields is None else tuple(sorted(fields)))
+
+
+def parse_fields(model: type[Base], fields: str) -> tuple[str, ...] | None:
+    """Parse a comma separated list of the keys to include in the response, e.g., the ``fields`` query parameter.
+
+    Args:
+        model (type[Base]): model being serialized
+        fields (str): comma separated keys (an empty string means all of them)
+
+    Raises:
+        ValueError: any of the keys aren't included in the model's serialized data
+
+    Returns:
+        tuple[str, ...] | None: the keys, or ``None`` for all of them
+    """
+    requested = tuple(dict.fromkeys(field.strip() for field in fields.split(",") if field.strip()))
+
+    if not requested:
+        return None
+
+    valid = [key for key, _ in schema_keys(model)]
+
+    if unknown := [field for field in requested if field not in valid]:
+        raise ValueError(f"Unknown field(s): {', '.join(unknown)}. The valid fields are: {', '.join(sorted(valid))}.")
+
+    return requested
+
+
 class ApiJSONProvider(DefaultJSONProvider):
     """Custom JSON provider for the API to automatically determine the serialization functions (and the actual included
     data) for each request response.
@@ -0,0 +1,153 @@
+"""Full text search indexes for category names and clue text, using SQLite FTS5 "external content" tables that are kept
+in sync with the ``category`` and ``set`` tables by triggers.
+"""
+
+import typing as t
+
+from sqlalchemy import (
+    Select,
+    Connection,
+    TableClause,
+    ColumnElement,
+    text,
+    event,
+    table,
+    column,
+    select,
+    literal_column,
+)
+
+from jeopardy.api.models import Set, Base, Category
+
+CATEGORY = table("category_search", column("rowid"), column("name"), column("rank"))
+SET = table("set_search", column("rowid"), column("answer"), column("question"), column("rank"))
+
+# Category names are matched on substrings (like the ``ILIKE '%...%'`` it replaces), so use trigrams. Trigrams need at
+# least three characters to be of any use, so any shorter query falls back to a scan.
+TRIGRAM = 3
+
+INDEXES = {
+    CATEGORY.name: ("category", ("name",), "tokenize = 'trigram'"),
+    SET.name: ("set", ("answer", "question"), "tokenize = 'porter unicode61 remove_diacritics 2'"),
+}
+
+
+def ddl(name: str) -> list[str]:
+    source, columns, options = INDEXES[name]
+    names = ", ".join(columns)
+
+    return [
+        f"CREATE VIRTUAL TABLE {name} USING fts5({names}, content = '{source}', content_rowid = 'id', {options})",
+        *triggers(name),
+    ]
+
+
+def triggers(name: str) -> list[str]:
+    source, columns, _ = INDEXES[name]
+
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    names = ", ".join(columns)
+
+    insert = f"INSERT INTO {name} (rowid, {names}) VALUES (new.id, {new});"
+    delete = f"INSERT INTO {name} ({name}, rowid, {names}) VALUES ('delete', old.id, {old});"
+
+    # Only updates to the indexed columns need to re-index the row, rather than, e.g., backfilling any other column
+    return [
+        f'CREATE TRIGGER IF NOT EXISTS {name}_insert AFTER INSERT ON "{source}" BEGIN {insert} END',
+        f'CREATE TRIGGER IF NOT EXISTS {name}_delete AFTER DELETE ON "{source}" BEGIN {delete} END',
+        f'CREATE TRIGGER IF NOT EXISTS {name}_update AFTER UPDATE OF {names} ON "{source}" BEGIN {delete} {insert} END',
+    ]
+
+
+def create(connection: Connection) -> list[str]:
+    """Create (and populate) any of the search indexes that are missing from the database.
+
+    Args:
+        connection (Connection): connection to the database
+
+    Returns:
+        list[str]: the names of the indexes that were created
+    """
+    created = []
+
+    for name in INDEXES:
+        if connection.scalar(text("SELECT count(*) FROM sqlite_master WHERE name = :name"), {"name": name}):
+            # Replace the triggers of existing indexes, which may have been created before the update trigger was
+            # limited to the indexed columns
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {name}_update"))
+
+            for statement in triggers(name):
+                connection.execute(text(statement))
+
+            continue
+
+        for statement in ddl(name):
+            connection.execute(text(statement))
+
+        connection.execute(text(f"INSERT INTO {name} ({name}) VALUES ('rebuild')"))
+        created.append(name)
+
+    return created
+
+
+def drop(connection: Connection) -> None:
+    """Remove the search indexes (and triggers), e.g., to avoid maintaining them during a bulk load."""
+    for name in INDEXES:
+        for trigger in ("insert", "delete", "update"):
+            connection.execute(text(f"DROP TRIGGER IF EXISTS {name}_{trigger}"))
+
+        connection.execute(text(f"DROP TABLE IF EXISTS {name}"))
+
+
+@event.listens_for(Base.metadata, "after_create")
+def after_create(target: t.Any, connection: Connection, **kwargs: t.Any) -> None:
+    create(connection)
+
+
+def quote(text: str) -> str:
+    """Quote text as a single FTS5 phrase, so any query syntax in it is matched literally."""
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def phrases(query: str) -> str:
+    """Quote each word of the query separately, so the words can appear anywhere (and in any order) in the match."""
+    return " ".join(quote(word) for word in query.split())
+
+
+def matches(index: TableClause, query: str) -> ColumnElement[bool]:
+    return literal_column(index.name).op("MATCH")(query)
+
+
+def category_names(query: str) -> ColumnElement[bool]:
+    """Filter for categories whose name contains the query, served from the search index where possible.
+
+    Args:
+        query (str): text to look for in the category name
+
+    Returns:
+        ColumnElement[bool]: where clause for a select of ``Category``
+    """
+    if len(query) < TRIGRAM:
+        return Category.name.ilike(f"%{query}%")
+
+    # The whole query is one phrase, so, like ``ILIKE``, it only matches where it appears as a contiguous substring
+    return Category.id.in_(select(CATEGORY.c.rowid).where(matches(CATEGORY, quote(query))))
+
+
+def ranked_categories(query: str) -> Select[Category]:
+    """Select the categories whose name contains the query, best matches first (or by name, for short queries)."""
+    if len(query) < TRIGRAM:
+        return select(Category).where(category_names(query)).order_by(Category.name, Category.id)
+
+    return (
+        select(Category)
+        .join(CATEGORY, CATEGORY.c.rowid == Category.id)
+        .where(matches(CATEGORY, quote(query)))
+        .order_by(CATEGORY.c.rank, Category.id)
+    )
+
+
+def ranked_sets(query: str) -> Select[Set]:
+    """Select the sets whose answer or question contains every word of the query, best matches first."""
+    return select(Set).join(SET, SET.c.rowid == Set.id).where(matches(SET, phrases(query))).order_by(SET.c.rank, Set.id)
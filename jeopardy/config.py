@@ -17,6 +17,7 @@ url: str | list[str] = "*"
 if env_url := os.getenv(key="APP_URL"):
     url = env_url.split(",")
 
+# Games are built in-process while this points at the server itself, and only requested over HTTP from any other API
 api_endpoint = os.getenv(key="API_ENDPOINT", default=f"http://127.0.0.1:{port}/api/v{api_version}/game")
 
 db_file = pathlib.Path(os.getenv(key="DB_FILE", default="sample.db")).absolute()
@@ -31,6 +32,43 @@ else:
 
 buzzer_time = 2
 
+### DATABASE SETTINGS ###
+# Applied to every SQLite connection the API opens (a value of ``None`` leaves SQLite's default)
+sqlite_pragmas = {
+    "journal_mode": os.getenv(key="SQLITE_JOURNAL_MODE", default="WAL"),
+    "synchronous": os.getenv(key="SQLITE_SYNCHRONOUS", default="NORMAL"),
+    "mmap_size": int(os.getenv(key="SQLITE_MMAP_SIZE", default=256 * 1024 * 1024)),
+    "cache_size": int(os.getenv(key="SQLITE_CACHE_SIZE", default=-64 * 1024)),
+    "temp_store": os.getenv(key="SQLITE_TEMP_STORE", default="MEMORY"),
+    "busy_timeout": int(os.getenv(key="SQLITE_BUSY_TIMEOUT", default=5000)),
+}
+
+# Serve the reads of GET requests from a separate pool of read-only connections
+read_only_pool = os.getenv(key="READ_ONLY_POOL", default="1") != "0"
+
+# Load the whole database file into memory at startup: "readonly" rejects any writes, and "writeback" copies them back
+# to the file every ``writeback_interval`` seconds (and on exit). Leave empty to read from the file as usual.
+in_memory = os.getenv(key="IN_MEMORY", default="").lower()
+writeback_interval = float(os.getenv(key="WRITEBACK_INTERVAL", default=60))
+
+# Choose the categories for each game from an in-memory, columnar index (see ``jeopardy.api.columnar``), instead of SQL
+columnar_games = os.getenv(key="COLUMNAR_GAMES", default="0") != "0"
+
+### BOARD POOL SETTINGS ###
+# Number of games to build ahead of time, with the default settings, so new rooms don't wait on a game (0 disables it)
+board_pool_size = int(os.getenv(key="BOARD_POOL_SIZE", default=4))
+# Most (estimated) bytes of game data the pool can hold
+board_pool_memory = int(os.getenv(key="BOARD_POOL_MEMORY", default=8 * 1024 * 1024))
+board_pool_settings = {"size": 6}
+
+### ROOM SETTINGS ###
+# Seconds a room can go without any activity before it's closed (0 keeps rooms open for as long as the server runs)
+room_ttl = float(os.getenv(key="ROOM_TTL", default=4 * 60 * 60))
+# Most rooms to keep open at once, closing the least recently active to make space (0 for no limit)
+room_capacity = int(os.getenv(key="ROOM_CAPACITY", default=0))
+# Seconds between each check for inactive rooms
+room_sweep_interval = float(os.getenv(key="ROOM_SWEEP_INTERVAL", default=60))
+
 ### DEBUG SETTINGS ###
 debug = bool(os.getenv(key="DEBUG", default=False))
 
@@ -0,0 +1,235 @@
+"""Bulk load JSON clue dumps (either a JSON array of sets, as in ``tests/_files/complete.json``, or NDJSON with one set
+per line) straight into the SQLite database, bypassing the API.
+
+Usage: ``DB_FILE=questions.db python -m jeopardy.load [--shortnames] FILE ...``
+
+The file pointed to by ``DB_FILE`` may be empty, in which case the tables are created. Progress is checkpointed in the
+database alongside each batch, so an interrupted load can be resumed by running the same command again.
+"""
+
+import json
+import time
+import typing as t
+import pathlib
+import itertools
+
+import click
+from sqlalchemy import Engine, text, event, create_engine
+from sqlalchemy.orm import Session
+
+from jeopardy import config
+from jeopardy.api import search, database
+from jeopardy.upgrade import upgrade, add_tables, add_columns
+from jeopardy.api.models import Base, CategorySummary
+
+PRAGMAS = ("journal_mode = WAL", "synchronous = OFF", "cache_size = -524288", "temp_store = MEMORY")
+
+CHECKPOINT_TABLE = (
+    "CREATE TABLE IF NOT EXISTS load_checkpoint (source VARCHAR NOT NULL PRIMARY KEY, rows INTEGER NOT NULL)"
+)
+CHECKPOINT_SELECT = "SELECT rows FROM load_checkpoint WHERE source = :source"
+CHECKPOINT_UPSERT = (
+    "INSERT INTO load_checkpoint (source, rows) VALUES (:source, :rows) "
+    "ON CONFLICT (source) DO UPDATE SET rows = excluded.rows"
+)
+
+
+def tune(engine: Engine) -> None:
+    """Configure every connection for bulk loading; trading durability (a crash may corrupt the file) for speed."""
+
+    @event.listens_for(engine, "connect")
+    def connect(dbapi_connection: t.Any, connection_record: t.Any) -> None:
+        cursor = dbapi_connection.cursor()
+
+        for pragma in PRAGMAS:
+            cursor.execute(f"PRAGMA {pragma}")
+
+        cursor.close()
+
+
+def iter_array(handle: t.TextIO, chunk_size: int = 1 << 20) -> t.Iterator[t.Any]:
+    """Incrementally decode the elements of a top level JSON array, without reading the whole file into memory.
+
+    Args:
+        handle (t.TextIO): file containing the JSON array
+        chunk_size (int, optional): number of characters to read at a time. Defaults to 1 MiB.
+
+    Yields:
+        t.Any: each element of the array
+    """
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+
+    def fill() -> None:
+        nonlocal buffer, position, eof
+        chunk = handle.read(chunk_size)
+        buffer, position, eof = buffer[position:] + chunk, 0, not chunk
+
+    def skip() -> str:
+        nonlocal position
+
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+
+            if position < len(buffer) or eof:
+                return buffer[position : position + 1]
+
+            fill()
+
+    if skip() != "[":
+        raise ValueError("The file must contain a JSON array")
+
+    position += 1
+
+    while (character := skip()) != "]":
+        if not character:
+            raise ValueError("The JSON array was not terminated")
+
+        try:
+            element, end = decoder.raw_decode(buffer, position)
+
+            if end == len(buffer) and not eof:
+                raise json.JSONDecodeError("Possibly truncated", buffer, end)
+
+        except json.JSONDecodeError:
+            if eof:
+                raise
+
+            fill()
+            continue
+
+        position = end
+        yield element
+
+
+def iter_ndjson(handle: t.TextIO) -> t.Iterator[t.Any]:
+    for line in handle:
+        if line.strip():
+            try:
+                yield json.loads(line)
+
+            except ValueError:
+                yield None
+
+
+def iter_file(path: pathlib.Path) -> t.Iterator[t.Any]:
+    with path.open("r", encoding="utf-8") as handle:
+        first = handle.read(1)
+
+        while first.isspace():
+            first = handle.read(1)
+
+        handle.seek(0)
+
+        yield from (iter_array if first == "[" else iter_ndjson)(handle)
+
+
+def load(
+    engine: Engine,
+    paths: t.Sequence[pathlib.Path],
+    uses_shortnames: bool = False,
+    batch_size: int = 50_000,
+    defer_indexes: bool = True,
+    restart: bool = False,
+    echo: t.Callable[[str], None] = lambda message: None,
+) -> dict[str, int]:
+    """Load the sets from each file into the database.
+
+    Args:
+        engine (Engine): engine connected to the database to load into
+        paths (t.Sequence[pathlib.Path]): files to load
+        uses_shortnames (bool, optional): whether the keys are the single letter abbreviations. Defaults to False.
+        batch_size (int, optional): number of sets to insert per transaction. Defaults to 50,000.
+        defer_indexes (bool, optional): drop the secondary and search indexes for the duration of the load, and rebuild
+            them once it's done. Defaults to True.
+        restart (bool, optional): ignore any saved progress, and start each file from the beginning. Defaults to False.
+        echo (t.Callable[[str], None], optional): function to report progress. Defaults to discarding it.
+
+    Returns:
+        dict[str, int]: the number of sets inserted, duplicated, errored, and skipped (having already been loaded)
+    """
+    totals = {"inserted": 0, "duplicate": 0, "error": 0, "skipped": 0}
+
+    with engine.begin() as connection:
+        created = add_tables(connection)
+
+        connection.execute(text(CHECKPOINT_TABLE))
+        add_columns(connection)
+
+        if defer_indexes:
+            for table in Base.metadata.sorted_tables:
+                for index in table.indexes:
+                    index.drop(connection, checkfirst=True)
+
+            search.drop(connection)
+
+    # Rather than recounting the category summaries after every batch, rebuild them all once the load is done
+    rebuild = defer_indexes or CategorySummary.__tablename__ in created
+    start, processed = time.perf_counter(), 0
+
+    try:
+        with Session(engine) as session:
+            loader = database.Loader(session=session, summaries=not rebuild)
+            loader.preload()
+
+            for path in paths:
+                source = str(path.absolute())
+                done = 0 if restart else session.scalar(text(CHECKPOINT_SELECT), {"source": source}) or 0
+
+                totals["skipped"] += done
+
+                for batch in database.batched(itertools.islice(iter_file(path), done, None), batch_size):
+                    results = loader.add(rows=batch, uses_shortnames=uses_shortnames)
+
+                    session.execute(text(CHECKPOINT_UPSERT), {"source": source, "rows": done + len(batch)})
+                    session.commit()
+
+                    for result in results:
+                        done, processed = done + 1, processed + 1
+                        totals[result["status"]] += 1
+
+                        if result["status"] == "error":
+                            echo(f"{path}:{done}: {result['message']}")
+
+                    echo(f"{path}: {done:,} sets read ({processed / (time.perf_counter() - start):,.0f} sets/s)")
+
+    finally:
+        if defer_indexes:
+            echo("Rebuilding indexes...")
+
+        if rebuild:
+            upgrade(engine, rebuild=True)
+
+    return totals
+
+
+@click.command()
+@click.argument("files", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False, path_type=pathlib.Path))
+@click.option("--shortnames", is_flag=True, help="The sets use the single letter abbreviations for each key.")
+@click.option("--batch-size", default=50_000, show_default=True, help="Number of sets to insert per transaction.")
+@click.option("--keep-indexes", is_flag=True, help="Maintain the indexes during the load, rather than rebuilding them.")
+@click.option("--restart", is_flag=True, help="Ignore any saved progress, and load each file from the beginning.")
+def main(files: tuple[pathlib.Path, ...], shortnames: bool, batch_size: int, keep_indexes: bool, restart: bool) -> None:
+    click.echo(f"Loading into the database file at: {config.db_file}")
+
+    engine = create_engine(config.api_db)
+    tune(engine)
+
+    start = time.perf_counter()
+    totals = load(
+        engine=engine,
+        paths=files,
+        uses_shortnames=shortnames,
+        batch_size=batch_size,
+        defer_indexes=not keep_indexes,
+        restart=restart,
+        echo=lambda message: click.echo(message, err=True),
+    )
+    elapsed = time.perf_counter() - start
+
+    click.echo(", ".join(f"{value:,} {key}" for key, value in totals.items()) + f" in {elapsed:,.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+"""A pool of games (the boards of every round) built ahead of time for the most common settings, so creating a room
+doesn't have to wait on choosing and loading its categories. The pool is refilled in the background as its games are
+taken, up to a number of games, and an (estimated) amount of memory.
+"""
+
+import sys
+import typing
+import threading
+import collections
+
+import flask
+
+from jeopardy.api import database
+
+# Seconds to wait before trying to refill the pool again, after a game couldn't be built
+RETRY_INTERVAL = 30
+
+POOL: "BoardPool | None" = None
+
+Fetch = typing.Callable[[dict[str, typing.Any]], tuple[typing.Any, str]]
+
+
+class BoardPool:
+    """Games built ahead of time for a single set of settings.
+
+    Args:
+        app (flask.Flask): the app to build the games in the context of
+        fetch (Fetch): builds a game from its settings, returning either its data or an error message (``alex.fetch``)
+        settings (dict): the settings (other than the room) the games are built with
+        rounds (tuple[int, ...]): the rounds each game has a board for
+        size (int): the number of games to keep ready
+        memory (int): the (estimated) bytes of game data to keep, at most
+    """
+
+    def __init__(
+        self,
+        app: flask.Flask,
+        fetch: Fetch,
+        settings: dict[str, typing.Any],
+        rounds: tuple[int, ...],
+        size: int,
+        memory: int,
+    ) -> None:
+        self.app, self.fetch = app, fetch
+        self.settings, self.rounds = settings, rounds
+        self.size, self.memory = size, memory
+
+        self.games: collections.deque[tuple[list[typing.Any], int]] = collections.deque()
+        self.bytes = 0
+
+        self.hits = self.misses = self.errors = 0
+
+        self.lock = threading.Lock()
+        self.wanted = threading.Event()
+        self.stopped = threading.Event()
+
+        database.changed.connect(self.clear, weak=False)
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def matches(self, settings: dict[str, typing.Any], rounds: typing.Iterable[int]) -> bool:
+        settings = {key: value for key, value in settings.items() if key != "room"}
+
+        return settings == self.settings and tuple(rounds) == self.rounds
+
+    def take(self) -> list[typing.Any] | None:
+        """Take a game from the pool (and wake up the background thread to replace it).
+
+        Returns:
+            list | None: the boards of the game, one for each round, or ``None`` if the pool is empty
+        """
+        with self.lock:
+            if not self.games:
+                self.misses += 1
+                game = None
+
+            else:
+                self.hits += 1
+                game, size = self.games.popleft()
+                self.bytes -= size
+
+        self.wanted.set()
+
+        return game
+
+    def fill(self) -> int:
+        """Build games until the pool is full, or holds as much data as it's allowed.
+
+        Returns:
+            int: the number of games added
+        """
+        added = 0
+
+        with self.app.app_context():
+            while len(self.games) < self.size and not self.stopped.is_set():
+                game, message = self.fetch({**self.settings, "rounds": ",".join(str(round_) for round_ in self.rounds)})
+
+                if message:
+                    self.errors += 1
+                    break
+
+                size = footprint(game)
+
+                with self.lock:
+                    if self.bytes + size > self.memory:
+                        break
+
+                    self.games.append((game, size))
+                    self.bytes += size
+
+                added += 1
+
+        return added
+
+    def clear(self, sender: typing.Any = None, **kwargs: typing.Any) -> None:
+        """Drop every game in the pool (e.g., as the data they were built from has changed)."""
+        with self.lock:
+            self.games.clear()
+            self.bytes = 0
+
+        self.wanted.set()
+
+    def run(self) -> None:
+        while not self.stopped.is_set():
+            errors = self.errors
+            self.fill()
+
+            if self.errors > errors:
+                self.stopped.wait(RETRY_INTERVAL)
+
+            else:
+                self.wanted.wait()
+
+            self.wanted.clear()
+
+    def start(self) -> None:
+        threading.Thread(target=self.run, name="board-pool", daemon=True).start()
+
+    def stop(self) -> None:
+        self.stopped.set()
+        self.wanted.set()
+
+        database.changed.disconnect(self.clear)
+
+    def metrics(self) -> dict[str, typing.Any]:
+        return {
+            "size": len(self.games),
+            "capacity": self.size,
+            "bytes": self.bytes,
+            "memory": self.memory,
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+        }
+
+
+def start(app: flask.Flask, fetch: Fetch, settings: dict[str, typing.Any], size: int, memory: int) -> BoardPool:
+    """Start (or restart) the pool of games, filling it in the background.
+
+    Args:
+        app (flask.Flask): the app to build the games in the context of
+        fetch (Fetch): builds a game from its settings (``alex.fetch``)
+        settings (dict): the settings (other than the room) of the games to keep ready
+        size (int): the number of games to keep ready
+        memory (int): the (estimated) bytes of game data to keep, at most
+
+    Returns:
+        BoardPool: the pool
+    """
+    global POOL
+
+    stop()
+
+    POOL = BoardPool(app=app, fetch=fetch, settings=settings, rounds=(0, 1, 2), size=size, memory=memory)
+    POOL.start()
+
+    return POOL
+
+
+def stop() -> None:
+    global POOL
+
+    if POOL is not None:
+        POOL.stop()
+        POOL = None
+
+
+def take(settings: dict[str, typing.Any], rounds: typing.Iterable[int]) -> list[typing.Any] | None:
+    """Take a game from the pool, if there's one built with these settings, for these rounds.
+
+    Args:
+        settings (dict): the settings of the game
+        rounds (typing.Iterable[int]): the rounds the game needs boards for
+
+    Returns:
+        list | None: the boards of the game, one for each round, or ``None`` if there isn't one ready
+    """
+    if POOL is None or not POOL.matches(settings, rounds):
+        return None
+
+    return POOL.take()
+
+
+def metrics() -> dict[str, typing.Any]:
+    return {"enabled": False} if POOL is None else {"enabled": True, **POOL.metrics()}
+
+
+def footprint(value: typing.Any, seen: set[int] | None = None) -> int:
+    """Estimate the bytes held by game data, either as JSON-like data or as the objects of a game being played,
+    following its containers and the attributes of the game's own objects (but not anything shared with the rest of the
+    server, e.g., modules, classes or threads). Anything referenced more than once is only counted once.
+    """
+    seen = set() if seen is None else seen
+
+    if id(value) in seen:
+        return 0
+
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+
+    if isinstance(value, dict):
+        return size + sum(footprint(key, seen) + footprint(item, seen) for key, item in value.items())
+
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(footprint(item, seen) for item in value)
+
+    if type(value).__module__.startswith("jeopardy"):
+        for name in getattr(type(value), "__slots__", ()):
+            size += footprint(getattr(value, name, None), seen)
+
+        if hasattr(value, "__dict__"):
+            size += footprint(vars(value), seen)
+
+    return size
@@ -1,8 +1,8 @@
 import random
 
-from flask import Blueprint, flash, request, session, url_for, redirect, render_template, get_flashed_messages
+from flask import Blueprint, flash, jsonify, request, session, url_for, redirect, render_template, get_flashed_messages
 
-from jeopardy import alex, config, sockets, storage
+from jeopardy import alex, pool, config, sockets, storage
 
 routing = Blueprint(name="routing", import_name=__name__)
 
@@ -42,6 +42,10 @@ def route_join(room: str = ""):
     room = room.upper()
 
     if not (room and room in storage.rooms()):
+        # Explain why a magic link no longer works, if its game has since been closed
+        if room and (message := storage.closed(room)):
+            flash(message=message, category="error")
+
         room = ""
 
     return render_template(template_name_or_list="join.html", errors=get_flashed_messages(), room_code=room)
@@ -142,7 +146,7 @@ def route_host():
 
     if room not in storage.rooms() or not room:
         flash(
-            message="The room code you entered was invalid or missing. Please try again!",
+            message=room_error(room),
             category="error",
         )
         return redirect(url_for("routing.route_join"))
@@ -168,7 +172,7 @@ def route_play():
 
         if room not in storage.rooms():
             flash(
-                message="The room code you entered was invalid or missing. Please try again!",
+                message=room_error(room),
                 category="error",
             )
             return redirect(url_for("routing.route_join", room=""))
@@ -223,7 +227,7 @@ def route_board():
 
         if room not in storage.rooms():
             flash(
-                message="The room code you entered was invalid or missing. Please try again!",
+                message=room_error(room),
                 category="error",
             )
             return redirect(url_for("routing.route_join"))
@@ -253,7 +257,7 @@ def route_results():
         # It would be very strange for someone to... "break" into the results page...
         if room not in storage.rooms():
             flash(
-                message="The room code you entered was invalid or missing. Please try again!",
+                message=room_error(room),
                 category="error",
             )
             return redirect(url_for("routing.route_join"))
@@ -309,6 +313,16 @@ def route_test():
         return redirect(url_for("routing.route_index"))
 
 
+@routing.route("/metrics/", methods=["GET"])
+def route_metrics():
+    """Reports the state of the game server, e.g., how often new rooms were given a game from the board pool, and the
+    number of open rooms (and the memory they use).
+
+    Only allows GET requests.
+    """
+    return jsonify({"board_pool": pool.metrics(), "rooms": storage.metrics()})
+
+
 @routing.errorhandler(500)
 def internal_server_error(error):
     """Directs Flask to load the error handling page on HTTP Status Code 500 (Server Errors)"""
@@ -325,3 +339,8 @@ def generate_room_code() -> str:
 
     else:
         return "ABCD"
+
+
+def room_error(room: str | None) -> str:
+    """The message shown when a room can't be found, which explains if (and why) its game was closed."""
+    return (room and storage.closed(room)) or "The room code you entered was invalid or missing. Please try again!"
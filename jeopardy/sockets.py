@@ -1,6 +1,6 @@
 from flask_socketio import SocketIO, rooms, join_room
 
-from jeopardy import config
+from jeopardy import config, storage
 
 socketio = SocketIO(cors_allowed_origins=config.url)
 
@@ -14,3 +14,4 @@ def on_join(data):
     """Connects the player to the specific room associated with the game"""
 
     join_room(room=data["room"])
+    storage.touch(data["room"])
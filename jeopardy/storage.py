@@ -1,15 +1,198 @@
-from jeopardy import alex
+"""The games being played, by room code. Rooms are closed once they've gone ``config.room_ttl`` seconds without any
+activity, and, when there's a ``config.room_capacity``, the least recently active room is closed to make space for a
+new one, so that abandoned games don't hold on to their memory for as long as the server runs.
+"""
 
-GAMES: dict = dict()
+import time
+import typing
+import threading
+import collections
+import collections.abc
+
+from jeopardy import alex, pool, config
+
+# The number of closed room codes to remember, to explain to anyone still trying to join them what happened
+CLOSED_LIMIT = 1000
+
+EXPIRED = "expired"
+EVICTED = "evicted"
+
+MESSAGES = {
+    EXPIRED: "That game was closed after being inactive for too long. Please start a new game!",
+    EVICTED: "That game was closed to make room for newer games. Please start a new game!",
+}
+
+
+class RoomStore(collections.abc.MutableMapping[str, "alex.Game"]):
+    """The games being played, by room code, ordered from the least to the most recently active.
+
+    Args:
+        ttl (float): seconds a room can go without any activity before it's closed (0 keeps rooms forever)
+        capacity (int): the most rooms to keep open at once (0 for no limit)
+        clock (typing.Callable[[], float], optional): the time, in seconds. Defaults to ``time.monotonic``.
+    """
+
+    def __init__(self, ttl: float, capacity: int, clock: typing.Callable[[], float] = time.monotonic) -> None:
+        self.ttl, self.capacity, self.clock = ttl, capacity, clock
+
+        self.games: collections.OrderedDict[str, alex.Game] = collections.OrderedDict()
+        self.activity: dict[str, float] = {}
+        self.closed: collections.OrderedDict[str, str] = collections.OrderedDict()
+        self.evictions = {EXPIRED: 0, EVICTED: 0}
+
+        self.lock = threading.RLock()
+
+    def __getitem__(self, room: str) -> alex.Game:
+        with self.lock:
+            if self.expired(room):
+                self.close(room, EXPIRED)
+
+            return self.games[room]
+
+    def __setitem__(self, room: str, value: alex.Game) -> None:
+        with self.lock:
+            self.games[room] = value
+            self.closed.pop(room, None)
+            self.touch(room)
+
+            while self.capacity and len(self.games) > self.capacity:
+                self.close(next(iter(self.games)), EVICTED)
+
+    def __delitem__(self, room: str) -> None:
+        with self.lock:
+            del self.games[room]
+            del self.activity[room]
+
+    def __contains__(self, room: object) -> bool:
+        try:
+            self[room]  # type: ignore[index]
+
+        except KeyError:
+            return False
+
+        return True
+
+    def __iter__(self) -> typing.Iterator[str]:
+        return iter(list(self.games))
+
+    def __len__(self) -> int:
+        return len(self.games)
+
+    def touch(self, room: str) -> None:
+        """Record activity in a room, which keeps it open for another ``ttl`` seconds."""
+        with self.lock:
+            if room in self.games:
+                self.activity[room] = self.clock()
+                self.games.move_to_end(room)
+
+    def expired(self, room: str) -> bool:
+        return bool(self.ttl) and room in self.activity and self.clock() - self.activity[room] > self.ttl
+
+    def close(self, room: str, reason: str) -> None:
+        with self.lock:
+            del self[room]
+
+            self.closed[room] = reason
+            self.evictions[reason] += 1
+
+            while len(self.closed) > CLOSED_LIMIT:
+                self.closed.popitem(last=False)
+
+    def sweep(self) -> int:
+        """Close every room which has been inactive for longer than the ``ttl``.
+
+        Returns:
+            int: the number of rooms closed
+        """
+        closed = 0
+
+        with self.lock:
+            # The rooms are in order of activity, so only those at the start need checking
+            while self.games and self.expired(room := next(iter(self.games))):
+                self.close(room, EXPIRED)
+                closed += 1
+
+        return closed
+
+    def clear(self) -> None:
+        with self.lock:
+            self.games.clear()
+            self.activity.clear()
+            self.closed.clear()
+
+    def metrics(self) -> dict[str, typing.Any]:
+        with self.lock:
+            sizes = [pool.footprint(game) for game in self.games.values()]
+
+        return {
+            "rooms": len(sizes),
+            "capacity": self.capacity,
+            "ttl": self.ttl,
+            "bytes": sum(sizes),
+            "bytes_per_room": sum(sizes) // len(sizes) if sizes else 0,
+            "evictions": dict(self.evictions),
+        }
+
+
+GAMES = RoomStore(ttl=config.room_ttl, capacity=config.room_capacity)
 
 
 def pull(room: str) -> alex.Game:
-    return GAMES[room.upper()]
+    room = room.upper()
+    game = GAMES[room]
+    GAMES.touch(room)
 
+    return game
 
-def push(room: str, value) -> None:
+
+def push(room: str, value: alex.Game) -> None:
     GAMES[room.upper()] = value
 
 
-def rooms():
+def touch(room: str) -> None:
+    GAMES.touch(room.upper())
+
+
+def rooms() -> typing.KeysView[str]:
     return GAMES.keys()
+
+
+def closed(room: str) -> str | None:
+    """The message explaining why a room is no longer open, if it was closed (rather than never existing)."""
+    if (reason := GAMES.closed.get(room.upper())) is None:
+        return None
+
+    return MESSAGES[reason]
+
+
+def metrics() -> dict[str, typing.Any]:
+    return GAMES.metrics()
+
+
+class Sweeper:
+    """Background thread which closes the inactive rooms every ``interval`` seconds."""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stopped = threading.Event()
+
+        threading.Thread(target=self.run, name="room-sweeper", daemon=True).start()
+
+    def run(self) -> None:
+        while not self.stopped.wait(self.interval):
+            GAMES.sweep()
+
+    def stop(self) -> None:
+        self.stopped.set()
+
+
+SWEEPER: Sweeper | None = None
+
+
+def start_sweeper(interval: float) -> Sweeper:
+    global SWEEPER
+
+    if SWEEPER is None:
+        SWEEPER = Sweeper(interval=interval)
+
+    return SWEEPER
@@ -0,0 +1,142 @@
+"""Upgrade an existing database file, in place, to match the current models without needing to re-import the data.
+
+Usage: ``DB_FILE=questions.db python -m jeopardy.upgrade``
+"""
+
+import click
+from sqlalchemy import Engine, Connection, text, inspect, create_engine
+from sqlalchemy.schema import CreateColumn
+
+from jeopardy import config
+from jeopardy.api import search, database
+from jeopardy.api.models import Base, CategorySummary
+
+
+def add_tables(connection: Connection) -> list[str]:
+    """Create any of the tables declared on the models that are missing from the database.
+
+    Args:
+        connection (Connection): connection to the database to upgrade
+
+    Returns:
+        list[str]: the names of the tables (and their indexes) that were created
+    """
+    added: list[str] = []
+    existing = set(inspect(connection).get_table_names())
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing:
+            table.create(connection)
+            added.extend([table.name, *sorted(str(index.name) for index in table.indexes)])
+
+    return added
+
+
+def add_columns(connection: Connection) -> list[str]:
+    """Add any of the columns declared on the models that are missing from the database. They're always nullable, as
+    SQLite can't add a ``NOT NULL`` column without a default.
+
+    Args:
+        connection (Connection): connection to the database to upgrade
+
+    Returns:
+        list[str]: the names (as ``table.column``) of the columns that were added
+    """
+    added: list[str] = []
+    inspector = inspect(connection)
+    preparer = connection.dialect.identifier_preparer
+
+    for table in Base.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name not in existing:
+                definition = CreateColumn(column).compile(dialect=connection.dialect)
+                connection.execute(text(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {definition}"))
+                added.append(f"{table.name}.{column.name}")
+
+    return added
+
+
+def missing(connection: Connection) -> list[str]:
+    """Find the tables, columns and full text search indexes declared on the models that are missing from the database,
+    i.e., whether it needs upgrading before the API can be served from it.
+
+    Args:
+        connection (Connection): connection to the database to check
+
+    Returns:
+        list[str]: the names of the missing tables, columns (as ``table.column``) and search indexes
+    """
+    inspector = inspect(connection)
+    tables = set(inspector.get_table_names())
+    names: list[str] = []
+
+    for table in Base.metadata.sorted_tables:
+        if table.name not in tables:
+            names.append(table.name)
+            continue
+
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+        names.extend(f"{table.name}.{column.name}" for column in table.columns if column.name not in existing)
+
+    names.extend(name for name in search.INDEXES if name not in tables)
+
+    return names
+
+
+def upgrade(engine: Engine, rebuild: bool = False) -> list[str]:
+    """Add any of the tables, columns (filling in their values) and indexes declared on the models, and full text search
+    indexes, that are missing from the database.
+
+    Args:
+        engine (Engine): engine connected to the database to upgrade
+        rebuild (bool, optional): recount every category summary, even if the table already existed. Defaults to False.
+
+    Returns:
+        list[str]: the names of the tables, columns and indexes that were created
+    """
+    created: list[str] = []
+
+    with engine.begin() as connection:
+        created.extend(add_tables(connection))
+        created.extend(add_columns(connection))
+
+        inspector = inspect(connection)
+
+        for table in Base.metadata.sorted_tables:
+            existing = {index["name"] for index in inspector.get_indexes(table.name)}
+
+            for index in sorted(table.indexes, key=lambda index: str(index.name)):
+                if index.name not in existing:
+                    index.create(connection)
+                    created.append(str(index.name))
+
+        # The search triggers are brought up to date first, so that backfilling the other columns doesn't re-index sets
+        created.extend(search.create(connection))
+
+        database.backfill(connection)
+
+        if rebuild or CategorySummary.__tablename__ in created:
+            database.summarize(connection)
+
+        if created:
+            connection.execute(text("ANALYZE"))
+
+    return created
+
+
+@click.command()
+@click.option("--rebuild", is_flag=True, help="Recount the category summaries of every category from its sets.")
+def main(rebuild: bool) -> None:
+    click.echo(f"Upgrading the database file at: {config.db_file}")
+
+    for name in upgrade(create_engine(config.api_db), rebuild=rebuild) or ([] if rebuild else ["(nothing to do)"]):
+        click.echo(f"  {name}")
+
+    if rebuild:
+        click.echo("Rebuilt the category summaries")
+
+
+if __name__ == "__main__":
+    main()
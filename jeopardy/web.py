@@ -1,4 +1,5 @@
 import sys
+import pathlib
 
 if "pytest" not in sys.modules:
     import eventlet
@@ -6,8 +7,11 @@ if "pytest" not in sys.modules:
     eventlet.monkey_patch()
 
 from flask import Flask
+from sqlalchemy import make_url
+from sqlalchemy.pool import QueuePool
 
-from jeopardy import api, config, rounds, routing, sockets
+from jeopardy import api, alex, pool, config, rounds, routing, sockets, storage, upgrade
+from jeopardy.api import memory, columnar, connection
 from jeopardy.api.schemas import ApiJSONProvider
 
 
@@ -22,13 +26,60 @@ def create_app():
     app.config["SQLALCHEMY_DATABASE_URI"] = config.api_db
     app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
 
+    pragmas = config.sqlite_pragmas
+
+    if config.in_memory:
+        database = memory.attach(
+            pathlib.Path(str(make_url(config.api_db).database)), config.in_memory, config.writeback_interval
+        )
+        # Logged as a warning so it's shown with Flask's default logging level, as with the other startup messages
+        app.logger.warning(database.report())
+
+        app.config["SQLALCHEMY_DATABASE_URI"] = database.url
+        app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {"poolclass": QueuePool}
+        app.config["READ_ONLY"] = database.read_only
+
+        # Readers don't need to wait for the table locks of the shared cache, and a read only copy can never be written
+        pragmas = {**pragmas, "read_uncommitted": "ON", "query_only": "ON" if database.read_only else None}
+
+    elif config.read_only_pool and (url := connection.read_only_url(config.api_db)):
+        app.config["SQLALCHEMY_BINDS"] = {connection.READ_ONLY: url}
+
     api.models.db.init_app(app)
+
+    with app.app_context():
+        for key, engine in api.models.db.engines.items():
+            connection.configure(engine, pragmas, read_only=key == connection.READ_ONLY)
+
+        # Databases created before the current models are missing columns (and tables) that the API reads from
+        with api.models.db.engine.connect() as conn:
+            if missing := upgrade.missing(conn):
+                raise RuntimeError(
+                    f"The database is missing {', '.join(missing)}. Upgrade it first with: python -m jeopardy.upgrade"
+                )
+
+        if config.columnar_games:
+            app.config["COLUMNAR_GAMES"] = True
+            columnar.index(engine=api.models.db.engine, session=api.models.db.session)
+
     app.json = ApiJSONProvider(app)
 
     app.register_blueprint(blueprint=rounds.rounds)
     app.register_blueprint(blueprint=routing.routing)
     app.register_blueprint(blueprint=api.bp)
 
+    if config.room_ttl and not app.config["TESTING"]:
+        storage.start_sweeper(interval=config.room_sweep_interval)
+
+    if config.board_pool_size and not app.config["TESTING"]:
+        pool.start(
+            app,
+            fetch=alex.fetch,
+            settings=config.board_pool_settings,
+            size=config.board_pool_size,
+            memory=config.board_pool_memory,
+        )
+
     return app
 
 
@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import select
+from flask.testing import FlaskClient
+
+from jeopardy import config
+from jeopardy.api import games, columnar, database
+from jeopardy.api.models import Category, CategorySummary, db, on_dates
+
+API_VERSION = config.api_version
+
+
+@pytest.fixture
+def columnar_client(app_factory, monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "columnar_games", True)
+    app = app_factory("full")
+
+    with app.app_context():
+        with app.test_client() as client:
+            yield client
+
+
+@pytest.mark.parametrize(
+    "filters",
+    (
+        {"rounds": (0, 1)},
+        {"rounds": (2,)},
+        {"rounds": (0, 1), "start": 1992, "stop": 1992},
+        {"rounds": (0, 1), "show_number": 2},
+        {"rounds": (1,), "show_id": 2, "allow_incomplete": True},
+        {"rounds": (0, 1, 2), "allow_incomplete": True},
+    ),
+)
+def test_candidates(columnar_client: FlaskClient, test_data: list[dict[str, str]], filters: dict):
+    index = columnar.index(engine=db.engine, session=db.session)
+    candidates = index.candidates(**filters)
+
+    start, stop = filters.get("start", 0), filters.get("stop", 9999)
+    expected = {
+        (i["category"], i["show"])
+        for i in test_data
+        if i["round"] in filters["rounds"]
+        and (i["complete"] or filters.get("allow_incomplete", False))
+        and start <= int(i["date"][:4]) <= stop
+        and filters.get("show_number", i["show"]) == i["show"]
+        and filters.get("show_id", i["show"]) == i["show"]
+    }
+    external = {(i["category"], i["show"]) for i in test_data if i["external"]}
+
+    assert len(candidates) == len(list(candidates))
+    assert {name for _, name in candidates} == {name for name, _ in expected - external}
+    assert len(index.candidates(**filters, allow_external=True)) == len({name_show for name_show in expected})
+
+
+@pytest.mark.parametrize(
+    "filters",
+    (
+        {"rounds": (0, 1)},
+        {"rounds": (2,), "allow_incomplete": True, "allow_external": True},
+        {"rounds": (0, 1), "start": 1992, "stop": 1992},
+        {"rounds": (0, 1), "show_number": 2},
+    ),
+)
+def test_candidates_match_summaries(columnar_client: FlaskClient, filters: dict):
+    # A category left without any sets has no summary, so mustn't be a candidate of the columnar index either
+    empty = db.session.scalars(select(Category).where(Category.name == "BEER")).first()
+    db.session.add(
+        Category(name="EMPTY", show_id=empty.show_id, date_id=empty.date_id, round_id=empty.round_id, complete=True)
+    )
+    db.session.flush()
+    database.changed.send(database)
+
+    index = columnar.index(engine=db.engine, session=db.session)
+    candidates = index.candidates(**filters)
+
+    rounds = filters["rounds"]
+    conditions = games.eligible(rounds, filters.get("allow_incomplete", False), filters.get("allow_external", False))
+    summaries = select(Category.id).join(CategorySummary, CategorySummary.category_id == Category.id).where(*conditions)
+
+    if "start" in filters:
+        summaries = summaries.where(on_dates(CategorySummary.date_ordinal, filters))
+
+    if "show_number" in filters:
+        summaries = summaries.where(Category.show.has(number=filters["show_number"]))
+
+    assert "EMPTY" not in {name for _, name in candidates}
+    assert sorted(id for id, _ in candidates) == sorted(db.session.scalars(summaries))
+
+    db.session.rollback()
+    database.changed.send(database)
+
+
+def test_game(columnar_client: FlaskClient, test_data: list[dict[str, str]]):
+    rv = columnar_client.get(f"/api/v{API_VERSION}/game")
+    assert rv.status_code == 200
+    assert len(rv.get_json()) == 6
+    assert all([j["value"] for j in i["sets"]] == sorted(j["value"] for j in i["sets"]) for i in rv.get_json())
+
+    rv = columnar_client.get(f"/api/v{API_VERSION}/game", query_string={"show_number": 2, "round": 1, "size": 5})
+    assert rv.status_code == 200
+    assert not any(j["external"] for i in rv.get_json() for j in i["sets"])
+
+    rv = columnar_client.get(f"/api/v{API_VERSION}/game", query_string={"size": 30})
+    assert rv.get_json()["message"] == "400 Bad Request: Only 19 categories were found."
+
+
+def test_refresh(columnar_client: FlaskClient):
+    before = columnar.index(engine=db.engine, session=db.session)
+
+    database.changed.send(database)
+
+    after = columnar.index(engine=db.engine, session=db.session)
+    assert after is not before
+    assert after.ids == before.ids
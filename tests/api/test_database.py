@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import text, select
 
 from jeopardy import api
 
@@ -266,3 +267,158 @@ def test_add_bad_external(emptyclient):
 
     with pytest.raises(api.database.BadDataError, match=".*external tag is supplied.*"):
         api.database.add(clue_data=clue, uses_shortnames=True)
+
+
+def test_add_many(emptyclient):
+    clue = {
+        "d": "2021-01-01",
+        "s": 5,
+        "r": 0,
+        "f": True,
+        "a": "answer",
+        "q": "question",
+        "e": True,
+        "v": 1,
+        "c": "test",
+    }
+    clues = [clue, {**clue, "q": "other"}, clue, {**clue, "v": -1}, {**clue, "s": 6, "d": "2021-01-02", "c": "more"}]
+
+    results = list(api.database.add_many(rows=clues, uses_shortnames=True, batch_size=2))
+
+    assert [result["status"] for result in results] == ["inserted", "inserted", "duplicate", "error", "inserted"]
+    assert results[3]["message"] == 'Please ensure the value is a positive number, with or without, a "$"'
+
+    first, second, last = (api.database.session.get(api.models.Set, results[i]["id"]) for i in (0, 1, 4))
+
+    assert first.category == second.category != last.category
+    assert (first.show.number, last.show.number) == (5, 6)
+    assert first.value == last.value
+
+
+def test_search_index_sync(emptyclient):
+    clue = {
+        "date": "2022-01-01",
+        "show": 7,
+        "round": 0,
+        "complete": True,
+        "answer": "this lemur is found on madagascar",
+        "question": "aye-aye",
+        "external": False,
+        "value": 1,
+        "category": "PRIMATES",
+    }
+
+    def found(query: str) -> list[int]:
+        return list(api.database.session.scalars(api.search.ranked_sets(query).with_only_columns(api.models.Set.id)))
+
+    added = api.database.add(clue_data=clue, uses_shortnames=False)
+    assert found("Madagascar") == [added.id]
+    assert api.database.session.scalars(api.search.ranked_categories("primate")).all() == [added.category]
+
+    added.answer = "this lemur is found on the island of madagascar"
+    api.database.session.commit()
+    assert found("island") == [added.id]
+
+    # Updating any other column (e.g., backfilling it) doesn't re-index the row
+    triggers = dict(
+        api.database.session.execute(text("SELECT name, sql FROM sqlite_master WHERE name LIKE '%search_update'")).all()
+    )
+    assert "AFTER UPDATE OF name ON" in triggers["category_search_update"]
+    assert "AFTER UPDATE OF answer, question ON" in triggers["set_search_update"]
+
+    assert api.database.delete(id=added.id)
+    assert found("madagascar") == []
+
+
+def test_date_ordinal(emptyclient):
+    clue = {
+        "date": "1984-09-10",
+        "show": 8,
+        "round": 0,
+        "complete": True,
+        "answer": "answer",
+        "question": "question",
+        "external": False,
+        "value": 1,
+        "category": "ORDINALS",
+    }
+    added = api.database.add(clue_data=clue, uses_shortnames=False)
+
+    assert added.date.ordinal == added.category.date_ordinal == added.date_ordinal == 5366
+    assert added.date.date.ordinal == 5366
+
+    years = select(api.models.Set).where(
+        api.models.on_dates(api.models.Set.date_ordinal, {"start": 1984, "stop": 1984})
+    )
+    assert api.database.session.scalars(years).all() == [added]
+
+    statement = years.compile(compile_kwargs={"literal_binds": True})
+    plan = api.database.session.execute(text(f"EXPLAIN QUERY PLAN {statement}")).all()
+    assert any("ix_set_date_ordinal" in row[-1] for row in plan)
+
+
+def test_category_summary(emptyclient):
+    clues = [
+        {
+            "date": "2001-02-03",
+            "show": 9,
+            "round": 1,
+            "complete": False,
+            "answer": f"answer {index}",
+            "question": "question",
+            "external": value == 2,
+            "value": value,
+            "category": "SUMMARIES",
+        }
+        for index, value in enumerate((1, 2, 2))
+    ]
+    added = [api.database.add(clue_data=clue, uses_shortnames=False) for clue in clues]
+
+    summary = api.database.session.get(api.models.CategorySummary, added[0].category_id)
+    assert (summary.round, summary.complete, summary.date_ordinal) == (1, False, added[0].date_ordinal)
+    assert (summary.set_count, summary.external_count, summary.value_count) == (3, 2, 2)
+
+    assert api.database.delete(id=added[1].id)
+    api.database.session.refresh(summary)
+    assert (summary.set_count, summary.external_count, summary.value_count) == (2, 1, 2)
+
+    for set_ in (added[0], added[2]):
+        assert api.database.delete(id=set_.id)
+
+    assert api.database.session.get(api.models.CategorySummary, added[0].category_id) is None
+
+
+def test_category_summary_positions(emptyclient):
+    clues = [
+        {
+            "date": f"2001-02-{day:02}",
+            "show": day,
+            "round": day % 2,
+            "complete": day % 3 != 0,
+            "answer": f"position {day}",
+            "question": f"position {day}",
+            "external": False,
+            "value": 1,
+            "category": f"POSITIONS {day}",
+        }
+        for day in range(1, 13)
+    ]
+    def positions() -> dict[tuple[int, bool], list[int]]:
+        groups: dict[tuple[int, bool], list[int]] = {}
+        for summary in api.database.session.scalars(select(api.models.CategorySummary)):
+            groups.setdefault((summary.round, summary.complete), []).append(summary.position)
+
+        return {group: sorted(numbers) for group, numbers in groups.items()}
+
+    before = sum(map(len, positions().values()))
+    added = [api.database.add(clue_data=clue, uses_shortnames=False) for clue in clues]
+
+    # The positions within each round and completeness stay dense from 0, as categories come and go
+    assert all(numbers == list(range(len(numbers))) for numbers in positions().values())
+    assert sum(map(len, positions().values())) == before + len(clues)
+
+    for set_ in added[::3] + added[2::5]:
+        assert api.database.delete(id=set_.id)
+
+    assert all(numbers == list(range(len(numbers))) for numbers in positions().values())
+    assert sum(map(len, positions().values())) == before + len(clues) - 6
@@ -0,0 +1,79 @@
+import shutil
+import pathlib
+import sqlite3
+
+import pytest
+
+from jeopardy import web, config
+from jeopardy.api import memory
+
+API_VERSION = config.api_version
+
+CLUE = {
+    "date": "2023-01-01",
+    "show": 9000,
+    "round": 0,
+    "complete": True,
+    "answer": "answer",
+    "question": "question",
+    "external": False,
+    "value": 200,
+    "category": "MEMORY",
+}
+
+
+@pytest.fixture
+def memory_app(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    path = pathlib.Path(shutil.copy(pathlib.Path("tests/_files/test-full.db"), tmp_path.joinpath("memory.db")))
+
+    def func(mode: str):
+        monkeypatch.setattr(config, "api_db", f"sqlite:///{path}")
+        monkeypatch.setattr(config, "in_memory", mode)
+        monkeypatch.setattr(config, "testing", True, raising=False)
+
+        return web.create_app(), path
+
+    yield func
+
+    memory.detach(path)
+
+
+def count(path: pathlib.Path) -> int:
+    with sqlite3.connect(path) as connection:
+        return connection.execute('SELECT count(*) FROM "set"').fetchone()[0]
+
+
+def test_read_only(memory_app, caplog: pytest.LogCaptureFixture):
+    app, path = memory_app("readonly")
+    client = app.test_client()
+
+    assert memory.DATABASES[path].load_time > 0
+    assert f"Loaded {path} into memory in" in caplog.text
+
+    rv = client.get(f"/api/v{API_VERSION}/details")
+    assert rv.status_code == 200 and rv.get_json()["sets"]["total"] == count(path)
+
+    rv = client.post(f"/api/v{API_VERSION}/set", json=CLUE)
+    assert rv.status_code == 405
+    assert "read only" in rv.get_json()["message"]
+
+
+def test_write_back(memory_app):
+    app, path = memory_app("writeback")
+    client = app.test_client()
+    before = count(path)
+
+    rv = client.post(f"/api/v{API_VERSION}/set", json=CLUE)
+    assert rv.status_code == 200
+
+    assert client.get(f"/api/v{API_VERSION}/details").get_json()["sets"]["total"] == before + 1
+    assert count(path) == before
+
+    assert memory.DATABASES[path].flush()
+    assert count(path) == before + 1
+    assert not memory.DATABASES[path].flush()
+
+
+def test_bad_mode(tmp_path: pathlib.Path):
+    with pytest.raises(ValueError, match="must be one of"):
+        memory.MemoryDatabase(path=tmp_path.joinpath("missing.db"), mode="sometimes")
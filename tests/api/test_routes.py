@@ -1,9 +1,17 @@
+import json
+import typing as t
+import collections
+from unittest import mock
+
 import pytest
+from sqlalchemy import event, select
 from flask.testing import FlaskClient
 from werkzeug.http import HTTP_STATUS_CODES
 from werkzeug.test import TestResponse
 
 from jeopardy import config
+from jeopardy.api import games, routes
+from jeopardy.api.models import CategorySummary, db
 
 API_VERSION = config.api_version
 
@@ -50,6 +58,28 @@ def test_get_details(testclient: FlaskClient, test_data: list[dict[str, str]]):
     assert list(rv.get_json().keys()) == ["air_dates", "categories", "sets", "shows"]
 
 
+def test_get_details_cached(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    rv = testclient.get(f"/api/v{API_VERSION}/details")
+    assert check_response(rv, 200)["sets"] == {"total": len(test_data), "has_external": 1, "no_external": 118}
+    assert check_response(rv, 200)["air_dates"] == {
+        "oldest": {"year": 1990, "month": 11, "day": 26},
+        "most_recent": {"year": 1992, "month": 8, "day": 13},
+    }
+
+    etag = rv.headers["ETag"]
+
+    rv = testclient.get(f"/api/v{API_VERSION}/details", headers={"If-None-Match": etag})
+    assert rv.status_code == 304
+
+    rv = testclient.delete(f"/api/v{API_VERSION}/set/id/119")
+    rv = testclient.get(f"/api/v{API_VERSION}/details", headers={"If-None-Match": etag})
+    assert check_response(rv, 200)["sets"]["total"] == len(test_data) - 1
+
+    rv = testclient.post(f"/api/v{API_VERSION}/set", json=test_data[-1])
+    rv = testclient.get(f"/api/v{API_VERSION}/details", headers={"If-None-Match": etag})
+    assert rv.status_code == 304
+
+
 def test_pagination(testclient: FlaskClient, test_data: list[dict[str, str]]):
     rv = testclient.get(f"/api/v{API_VERSION}/set", query_string={"number": 13, "start": 4})
     check_response(rv, 200, length=13)
@@ -96,6 +126,48 @@ def test_set_changes(testclient: FlaskClient, test_data: list[dict[str, str]]):
     check_response(rv, 400, "The question set supplied is missing some data. Every field is required.")
 
 
+def test_set_changes_bulk(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    sets = test_data[-2:]
+
+    for id in (118, 119):
+        rv = testclient.delete(f"/api/v{API_VERSION}/set/id/{id}")
+        assert check_response(rv, 200) == {"deleted": id}
+
+    rv = testclient.post(f"/api/v{API_VERSION}/set", json=[*sets, sets[0], {"category": "alex"}, "alex"])
+    data = check_response(rv, 200)
+
+    assert {k: data[k] for k in ("inserted", "duplicate", "error")} == {"inserted": 2, "duplicate": 1, "error": 2}
+    assert data["results"][:3] == [
+        {"status": "inserted", "id": 118},
+        {"status": "inserted", "id": 119},
+        {"status": "duplicate"},
+    ]
+    assert data["results"][3]["message"].startswith("This set is missing the following keys:")
+    assert data["results"][4] == {"status": "error", "message": "Please ensure the set is a JSON object"}
+
+    for id, set_ in zip((118, 119), sets):
+        rv = testclient.get(f"/api/v{API_VERSION}/set/id/{id}")
+        assert check_response(rv, 200) == {**set_, "id": id}
+
+
+def test_set_changes_ndjson(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    set_ = test_data[-1]
+
+    rv = testclient.delete(f"/api/v{API_VERSION}/set/id/119")
+    assert check_response(rv, 200) == {"deleted": 119}
+
+    rv = testclient.post(
+        f"/api/v{API_VERSION}/set",
+        data="\n".join((json.dumps(set_), "", "{alex", json.dumps(set_))),
+        content_type="application/x-ndjson",
+    )
+    assert check_response(rv, 200)["results"] == [
+        {"status": "inserted", "id": 119},
+        {"status": "error", "message": "Please ensure the set is a JSON object"},
+        {"status": "duplicate"},
+    ]
+
+
 def test_sets_by_show(testclient: FlaskClient, test_data: list[dict[str, str]]):
     matching = [i for i in test_data if i["show"] == 1]
 
@@ -300,6 +372,58 @@ def test_categories_by_name(testclient: FlaskClient, test_data: list[dict[str, s
     check_response(rv, 200, length=len(matching))
 
 
+@pytest.mark.parametrize("name", ["OF THE", "of the rings", "D O", "LORD RINGS", "THE LORD", "OF"])
+def test_categories_by_name_substring(testclient: FlaskClient, test_data: list[dict[str, str]], name: str):
+    # The name is matched as one contiguous substring, whatever the length of its words (or of the name itself)
+    matching = {f"{i['category']}_{i['show']}" for i in test_data if name.upper() in i["category"]}
+
+    rv = testclient.get(f"/api/v{API_VERSION}/category/name/{name}")
+
+    if matching:
+        check_response(rv, 200, length=len(matching))
+
+    else:
+        check_response(rv, 404, "no items were found with that query")
+
+
+def test_search_categories(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    matching = {f"{i['category']}_{i['show']}" for i in test_data if "CHRIST" in i["category"]}
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/category/christ")
+    check_response(rv, 200, length=len(matching))
+
+    matching = {f"{i['category']}_{i['show']}" for i in test_data if "EE" in i["category"]}
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/category/ee")
+    check_response(rv, 200, length=len(matching))
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/category/zzz")
+    check_response(rv, 404, "no items were found with that query")
+
+
+def test_search_sets(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    matching = [i for i in test_data if "space" in f"{i['answer']} {i['question']}".lower()]
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/set/Space")
+    data = check_response(rv, 200, length=len(matching))["data"]
+    assert all("space" in f"{i['answer']} {i['question']}".lower() for i in data)
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/set/space?number=4&cursor=")
+    ids, cursor = [i["id"] for i in rv.get_json()["data"]], rv.get_json()["cursor"]
+
+    while cursor:
+        rv = testclient.get(f"/api/v{API_VERSION}/search/set/space?number=4&cursor={cursor}")
+        ids, cursor = ids + [i["id"] for i in rv.get_json()["data"]], rv.get_json()["cursor"]
+
+    assert ids == [i["id"] for i in data]
+
+    rv = testclient.get(f'/api/v{API_VERSION}/search/set/"a OR')
+    check_response(rv, 200)
+
+    rv = testclient.get(f"/api/v{API_VERSION}/search/set/%20")
+    check_response(rv, 400, "Please provide some text to search for.")
+
+
 def test_categories_by_show(testclient: FlaskClient, test_data: list[dict[str, str]]):
     matching = {f"{i['category']}" for i in test_data if i["show"] == 1}
 
@@ -416,9 +540,310 @@ def test_game_resource(testclient: FlaskClient, test_data: list[dict[str, str]])
         rv, 400, "The round number must be one of 0 (Jeopardy!), 1 (Double Jeopardy!), or 2 (Final Jeopardy!)"
     )
 
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"start": 0, "stop": 2000})
+    check_response(rv, 400, "The year range must be between 0001 and 9999.")
+
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"start": 2000, "stop": 1990})
+    check_response(rv, 400, "The stop year must come after the starting year.")
+
     rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"size": 30})
-    check_response(rv, 400, "Only 20 categories were found.")
+    check_response(rv, 400, "Only 19 categories were found.")
 
     # Due to omitting duplicated category names
     rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"size": 18})
-    check_response(rv, 400, "Only 20 categories were found.")
+    check_response(rv, 400, "Only 19 categories were found.")
+
+
+def test_game_resource_rounds(testclient: FlaskClient):
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"rounds": "0,1,2", "size": 5})
+    boards = check_response(rv, 200)
+
+    assert [len(board) for board in boards] == [5, 5, 1]
+    assert [{i["category"]["round"] for i in board} for board in boards] == [{0}, {1}, {2}]
+
+    names = [i["category"]["name"] for board in boards for i in board]
+    assert len(names) == len(set(names))
+
+    for query_string in ({"rounds": "0,3"}, {"rounds": "zero"}):
+        rv = testclient.get(f"/api/v{API_VERSION}/game", query_string=query_string)
+        check_response(
+            rv, 400, "The round number must be one of 0 (Jeopardy!), 1 (Double Jeopardy!), or 2 (Final Jeopardy!)"
+        )
+
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"rounds": "0,1", "round": 0})
+    check_response(rv, 400, "Only one of Round or Rounds can be supplied at a time.")
+
+    # Every board draws from the same pool of names, so there aren't enough for two full boards of the same round
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"rounds": "0,0", "size": 9})
+    assert rv.status_code == 400
+
+
+@pytest.mark.parametrize("query_string", ({"size": 4}, {"size": 4, "start": 1960, "stop": 2030}))
+def test_game_resource_exclude(testclient: FlaskClient, query_string: dict[str, t.Any]):
+    exclude = [i["category"]["name"] for i in check_response(testclient.get(f"/api/v{API_VERSION}/game"), 200)]
+
+    for _ in range(5):
+        rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={**query_string, "exclude": exclude})
+        names = [i["category"]["name"] for i in check_response(rv, 200)]
+
+        assert len(names) == 4 and not set(names) & set(exclude)
+
+
+def test_game_resource_external(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    shown = [i for i in test_data if i["show"] == 2 and i["round"] == 1 and i["complete"]]
+    names = {i["category"] for i in shown}
+    external = {i["category"] for i in shown if i["external"]}
+
+    assert external and names - external
+
+    # Only the categories without any external sets can be chosen, unless they're allowed
+    query_string = {"show_number": 2, "round": 1, "size": len(names - external)}
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string=query_string)
+    assert {i["category"]["name"] for i in check_response(rv, 200)} == names - external
+
+    rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={**query_string, "size": len(names)})
+    check_response(rv, 400, f"Only {len(names - external)} categories were found.")
+
+    rv = testclient.get(
+        f"/api/v{API_VERSION}/game", query_string={**query_string, "size": len(names), "allow_external": True}
+    )
+    assert {i["category"]["name"] for i in check_response(rv, 200)} == names
+
+
+@pytest.mark.parametrize("endpoint", ("set", "show", "category", "set/years/1990/1992", "category/complete"))
+def test_pagination_cursor(testclient: FlaskClient, endpoint: str):
+    rv = testclient.get(f"/api/v{API_VERSION}/{endpoint}", query_string={"number": 200})
+    expected = [i["id"] for i in check_response(rv, 200)["data"]]
+
+    data: list[int] = []
+    query_string = {"number": 7, "cursor": ""}
+
+    while True:
+        rv = testclient.get(f"/api/v{API_VERSION}/{endpoint}", query_string=query_string)
+        page = check_response(rv, 200)
+
+        assert len(page["data"]) <= 7
+        data.extend(i["id"] for i in page["data"])
+
+        if (cursor := page["cursor"]) is None:
+            break
+
+        query_string["cursor"] = cursor
+
+    assert data == expected
+
+
+def test_pagination_cursor_invalid(testclient: FlaskClient):
+    rv = testclient.get(f"/api/v{API_VERSION}/set", query_string={"cursor": "alex"})
+    check_response(rv, 400, "The cursor supplied is invalid.")
+
+
+@pytest.fixture
+def queries(testclient: FlaskClient):
+    statements: list[str] = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    for engine in db.engines.values():
+        event.listen(engine, "before_cursor_execute", count)
+
+    yield statements
+
+    for engine in db.engines.values():
+        event.remove(engine, "before_cursor_execute", count)
+
+
+@pytest.mark.parametrize(
+    "endpoint, limit",
+    (
+        ("set", 2),
+        ("set?cursor=", 1),
+        ("set/id/5", 1),
+        ("set/round/0", 2),
+        ("set/round/2", 2),
+        ("set/years/1990/1995", 2),
+        ("show", 2),
+        ("show/id/1", 1),
+        ("category", 2),
+        ("category/id/5", 1),
+        ("category/complete/true", 2),
+        ("category/show/number/1", 2),
+        ("search/set/space", 2),
+        # Sampling a board can take a few rounds of probes (and then a select of every eligible category) on a corpus
+        # as small as the test one, but never more than that, whatever the size of the board
+        ("game", games.SAMPLE_ATTEMPTS + 4),
+    ),
+)
+def test_query_count(testclient: FlaskClient, queries: list[str], endpoint: str, limit: int):
+    rv = testclient.get(f"/api/v{API_VERSION}/{endpoint}")
+    check_response(rv, 200)
+
+    assert len(queries) <= limit, "\n".join(queries)
+
+
+def test_fields(testclient: FlaskClient, queries: list[str]):
+    rv = testclient.get(f"/api/v{API_VERSION}/set?fields=id,category&number=5")
+    data = check_response(rv, 200, length=5)["data"]
+
+    assert all(set(item) == {"id", "category"} for item in data)
+    assert not any("answer" in statement for statement in queries)
+
+    full = check_response(testclient.get(f"/api/v{API_VERSION}/set?number=5"), 200)["data"]
+    assert data == [{"id": item["id"], "category": item["category"]} for item in full]
+
+    rv = testclient.get(f"/api/v{API_VERSION}/category/round/0?fields=name&cursor=&number=3")
+    assert all(set(item) == {"name"} for item in check_response(rv, 200, length=3)["data"])
+
+    rv = testclient.get(f"/api/v{API_VERSION}/show?fields=number,hash")
+    check_response(rv, 400, "Unknown field(s): hash. The valid fields are: date, id, number.")
+
+
+@pytest.mark.parametrize(
+    "endpoint",
+    ("set?number=7", "set?number=7&cursor=", "category/round/1?start=3", "show", "search/category/the?cursor="),
+)
+def test_compiled_serializer(testclient: FlaskClient, monkeypatch: pytest.MonkeyPatch, endpoint: str):
+    rv = testclient.get(f"/api/v{API_VERSION}/{endpoint}")
+    compiled = check_response(rv, 200)
+
+    # A resource can load the models instead, which must give exactly the same response
+    monkeypatch.setattr(routes.BaseResource, "compiled", False)
+
+    with mock.patch("jeopardy.api.routes.row_serializer") as serializer:
+        assert testclient.get(f"/api/v{API_VERSION}/{endpoint}").get_data() == rv.get_data()
+
+    assert not serializer.called and compiled["data"]
+
+
+def test_export(testclient: FlaskClient, test_data: list[dict[str, str]]):
+    rv = testclient.get(f"/api/v{API_VERSION}/export")
+    assert rv.status_code == 200 and rv.mimetype == "application/x-ndjson"
+
+    lines = [json.loads(line) for line in rv.get_data(as_text=True).splitlines()]
+    assert len(lines) == len(test_data)
+    assert lines[0] == check_response(testclient.get(f"/api/v{API_VERSION}/set/id/{lines[0]['id']}"), 200)
+    assert [line["id"] for line in lines] == sorted(line["id"] for line in lines)
+
+    rv = testclient.get(f"/api/v{API_VERSION}/export?after={lines[99]['id']}")
+    assert [json.loads(line) for line in rv.get_data(as_text=True).splitlines()] == lines[100:]
+
+    rv = testclient.get(f"/api/v{API_VERSION}/export?format=json&round=1&complete=true&fields=question")
+    data = rv.get_json()
+    assert len(data) == len([i for i in test_data if i["round"] == 1 and i["complete"]])
+    assert all(set(item) == {"id", "question"} for item in data)
+
+    rv = testclient.get(f"/api/v{API_VERSION}/export?format=json&start=1800&stop=1801")
+    assert rv.get_json() == []
+
+    rv = testclient.get(f"/api/v{API_VERSION}/export?format=xml")
+    check_response(rv, 400, "The export format must be one of: ndjson, json.")
+
+    rv = testclient.get(f"/api/v{API_VERSION}/export?round=4")
+    check_response(rv, 400, "the round must be one of 0 (Jeopardy!), 1 (Double Jeopardy!), or 2 (Final Jeopardy!)")
+
+
+def test_read_only_pool(testclient: FlaskClient):
+    engines: dict[str | None, list[str]] = {key: [] for key in db.engines}
+    listeners = {key: lambda *args, key=key: engines[key].append(args[2]) for key in db.engines}
+
+    for key, engine in db.engines.items():
+        event.listen(engine, "before_cursor_execute", listeners[key])
+
+    check_response(testclient.get(f"/api/v{API_VERSION}/set?number=1"), 200)
+    assert engines["read_only"] and not engines[None]
+
+    for key, engine in db.engines.items():
+        event.remove(engine, "before_cursor_execute", listeners[key])
+
+    with db.engines["read_only"].connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == config.sqlite_pragmas["busy_timeout"]
+
+        with pytest.raises(Exception, match="readonly"):
+            connection.exec_driver_sql("DELETE FROM round")
+
+    with db.engines[None].connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+
+
+@pytest.mark.parametrize("query_string", ({}, {"page": 3}, {"cursor": ""}))
+def test_set_listing_plan(testclient: FlaskClient, query_string: dict[str, t.Any]):
+    statements: list[tuple[str, t.Any]] = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    for engine in db.engines.values():
+        event.listen(engine, "before_cursor_execute", record)
+
+    rv = testclient.get(f"/api/v{API_VERSION}/set", query_string=query_string)
+    check_response(rv, 200)
+
+    if cursor := rv.get_json().get("cursor"):
+        check_response(testclient.get(f"/api/v{API_VERSION}/set", query_string={"cursor": cursor}), 200)
+
+    for engine in db.engines.values():
+        event.remove(engine, "before_cursor_execute", record)
+
+    listings = [(statement, parameters) for statement, parameters in statements if "ORDER BY" in statement]
+    assert listings
+
+    with db.engine.connect() as connection:
+        for statement, parameters in listings:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            assert not any("TEMP B-TREE" in row[-1] for row in plan), plan
+
+
+def test_game_sampling_distribution(testclient: FlaskClient):
+    eligible = set(
+        db.session.scalars(
+            select(CategorySummary.category_id).where(
+                *games.eligible((0, 1), allow_incomplete=False, allow_external=False)
+            )
+        )
+    )
+    draws = 3000
+
+    counts = collections.Counter(
+        category_id
+        for _ in range(draws)
+        for category_id in games.sample(
+            (0, 1), allow_incomplete=False, allow_external=False, size=1, selected={}
+        ).values()
+    )
+
+    # Every eligible category is as likely to be drawn as any other (a sample of ~175 each has a deviation of ~13)
+    assert set(counts) == eligible
+    assert all(abs(count - draws / len(eligible)) < 0.3 * draws / len(eligible) for count in counts.values()), counts
+
+
+def test_game_sampling(testclient: FlaskClient):
+    statements: list[tuple[str, t.Any]] = []
+
+    def record(conn, cursor, statement, parameters, *args):
+        statements.append((statement, parameters))
+
+    for engine in db.engines.values():
+        event.listen(engine, "before_cursor_execute", record)
+
+    check_response(testclient.get(f"/api/v{API_VERSION}/game", query_string={"size": 3}), 200)
+
+    for engine in db.engines.values():
+        event.remove(engine, "before_cursor_execute", record)
+
+    # Finding the number of positions, and each draw, is a seek into the index of the positions, rather than a scan of
+    # every eligible category
+    with db.engine.connect() as connection:
+        for statement, parameters in statements[:2]:
+            plan = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+
+            assert any("ix_category_summary_position" in row[-1] for row in plan), plan
+            assert not any(row[-1].startswith("SCAN category_summary") for row in plan), plan
+
+    # Asking for nearly every eligible category falls back to sampling from all of them
+    assert games.sample((0, 1), allow_incomplete=False, allow_external=False, size=50, selected={}) is None
+
+    for _ in range(10):
+        rv = testclient.get(f"/api/v{API_VERSION}/game", query_string={"rounds": "0,1", "size": 6})
+        names = [i["category"]["name"] for board in check_response(rv, 200) for i in board]
+        assert len(names) == len(set(names)) == 12
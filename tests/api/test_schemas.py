@@ -4,11 +4,14 @@ import typing as t
 import datetime
 
 import pytest
+import sqlalchemy
+from sqlalchemy import select
 from faker.proxy import Faker
+from flask.testing import FlaskClient
 from sqlalchemy.exc import NoInspectionAvailable
 
 from jeopardy.api.models import *
-from jeopardy.api.schemas import ApiJSONProvider, schema_keys
+from jeopardy.api.schemas import ApiJSONProvider, schema_keys, loading_plan, row_serializer
 
 
 def parse(data: Base) -> dict[str, t.Any]:
@@ -122,3 +125,15 @@ def test_set(faker: Faker):
         "answer": answer,
         "question": question,
     }
+
+
+@pytest.mark.parametrize("model", (Set, Category, Date, Show, Round, Value))
+def test_row_serializer(testclient: FlaskClient, model: type[Base]):
+    query = select(model).order_by(*sqlalchemy.inspect(model).primary_key)
+    serializer = row_serializer(model)
+
+    models = db.session.scalars(query.options(*loading_plan(model))).all()
+    rows = [serializer(row) for row in db.session.execute(serializer.select(query))]
+
+    assert len(rows) > 0
+    assert testclient.application.json.dumps(rows) == testclient.application.json.dumps(models)
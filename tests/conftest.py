@@ -9,10 +9,12 @@ from urllib import request as urllib_request
 
 import pytest
 from flask import request, url_for, wrappers
+from sqlalchemy import create_engine
 
 sys.path.append(pathlib.Path(__file__).parent.parent.joinpath("jeopardy"))
 
 from jeopardy import web, config, sockets, storage  # noqa: E402
+from jeopardy.upgrade import upgrade  # noqa: E402
 
 
 @pytest.fixture(scope="module", autouse=True)
@@ -20,7 +22,8 @@ def populate_databases():
     dbs = (pathlib.Path("tests/_files/test-empty.db"), pathlib.Path("tests/_files/test-full.db"))
 
     for db in dbs:
-        db.unlink(missing_ok=True)
+        for path in (db, db.with_name(f"{db.name}-wal"), db.with_name(f"{db.name}-shm")):
+            path.unlink(missing_ok=True)
 
         sql = db.with_suffix("").with_suffix(".db.sqlite").read_text()
 
@@ -29,10 +32,15 @@ def populate_databases():
         cur.executescript(sql)
         con.close()
 
+        engine = create_engine(f"sqlite:///{db.absolute()}")
+        upgrade(engine)
+        engine.dispose()
+
     yield
 
     for db in dbs:
-        db.unlink(missing_ok=True)
+        for path in (db, db.with_name(f"{db.name}-wal"), db.with_name(f"{db.name}-shm")):
+            path.unlink(missing_ok=True)
 
 
 @pytest.fixture(scope="session", autouse=True)
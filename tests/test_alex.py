@@ -1,4 +1,5 @@
 import json
+import time
 import urllib
 import hashlib
 from io import BytesIO
@@ -7,6 +8,12 @@ from unittest import mock
 import pytest
 
 from jeopardy import alex, config
+from jeopardy.api import games, database
+
+
+@pytest.fixture
+def remote_api(monkeypatch: pytest.MonkeyPatch):
+    monkeypatch.setattr(config, "api_endpoint", f"https://api.example.com/api/v{config.api_version}/game")
 
 
 def test_safe_name():
@@ -50,7 +57,27 @@ def test_category_creation(samplecategory):
     assert (category.sets[0].value == 0) & (category.sets[-1].value == 4)
 
 
-def test_board_creation_r0(webclient):
+def test_shared_clues(samplecategory):
+    data, _ = samplecategory
+
+    first = alex.Category(name=data["category"]["name"], index=0, sets=data["sets"])
+
+    # The same sets on another board (e.g., in another room) share their text, but not their state
+    copies = [{**set_, "answer": "".join(list(set_["answer"]))} for set_ in data["sets"]]
+    second = alex.Category(name=data["category"]["name"], index=1, sets=copies)
+
+    assert all(i.answer is j.answer and i.year is j.year for i, j in zip(first.sets, second.sets))
+
+    assert not second.sets[0].shown
+    assert not first.sets[0]._shown
+
+    assert not hasattr(first.sets[0], "__dict__")
+
+    database.changed.send()
+    assert not alex.CLUES
+
+
+def test_board_creation_r0(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=0").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -65,7 +92,7 @@ def test_board_creation_r0(webclient):
     assert sum([j.is_wager for i in board.categories for j in i.sets]) == 1
 
 
-def test_board_creation_r1(webclient):
+def test_board_creation_r1(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=1").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -78,7 +105,7 @@ def test_board_creation_r1(webclient):
     assert sum([j.is_wager for i in board.categories for j in i.sets]) == 2
 
 
-def test_board_creation_r2(webclient):
+def test_board_creation_r2(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=2&size=1").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -89,7 +116,7 @@ def test_board_creation_r2(webclient):
     assert len(board.categories) == 1
 
 
-def test_board_creation_debug(webclient):
+def test_board_creation_debug(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=1").get_json()
 
     config.debug = True
@@ -106,7 +133,7 @@ def test_board_creation_debug(webclient):
     assert board.categories[0].sets[0].is_wager
 
 
-def test_board_creation_400(webclient):
+def test_board_creation_400(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=3").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -121,7 +148,7 @@ def test_board_creation_400(webclient):
     assert board.message == data["message"]
 
 
-def test_board_creation_404(webclient):
+def test_board_creation_404(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/404").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -139,7 +166,7 @@ def test_board_creation_404(webclient):
     )
 
 
-def test_board_creation_500(webclient):
+def test_board_creation_500(webclient, remote_api):
     data = webclient.flask_test_client.get(f"/api/v{config.api_version}/500").get_json()
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
@@ -154,9 +181,14 @@ def test_board_creation_500(webclient):
     assert board.message == "An unknown error occurred. Please submit a bug report with details!"
 
 
-def test_game_creation(webclient, clean_content):
-    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=0&size=6").get_json()
-    content = clean_content(data[0]["sets"][0])
+def test_game_creation(webclient, remote_api, clean_content):
+    first = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=0&size=6").get_json()
+    exclude = [i["category"]["name"] for i in first]
+
+    data = webclient.flask_test_client.get(
+        f"/api/v{config.api_version}/game", query_string={"rounds": "1,2", "size": 6, "exclude": exclude}
+    ).get_json()
+    content = clean_content(first[0]["sets"][0])
 
     game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
 
@@ -179,9 +211,18 @@ def test_game_creation(webclient, clean_content):
         game.remaining_content
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
-        mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
+        mock_urlopen.return_value.read.return_value.decode.side_effect = [json.dumps(first), json.dumps(data)]
 
         game.make_board()
+        game.prefetching.join()
+
+    # Only the first round's board is waited on, and the rest are requested in the background
+    assert mock_urlopen.call_count == 2
+
+    board, prefetch = (call.args[0] for call in mock_urlopen.call_args_list)
+    assert "round=0" in board and "exclude" not in board
+    assert "rounds=1%2C2" in prefetch
+    assert all(f"exclude={urllib.parse.quote_plus(name)}" in prefetch for name in exclude)
 
     assert (len(game.board.categories) == 6) & (len(game.board.categories) * 5 == game.remaining_content)
 
@@ -189,15 +230,17 @@ def test_game_creation(webclient, clean_content):
 
     assert game.round == 0
 
+    names = [str(category) for board in game.boards.values() for category in board.categories]
+    assert len(names) == len(set(names)) == 13
+
     # Second Round
-    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=1&size=6").get_json()
-    content = clean_content(data[0]["sets"][0])
+    content = clean_content(data[0][0]["sets"][0])
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
-        mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
-
         game.start_next_round()
 
+    assert not mock_urlopen.called
+
     assert game.round == 1
     assert game.round_text() == f"Double {config.game_name}!"
     assert game.round_text(upcoming=True) == f"Final {config.game_name}!"
@@ -206,6 +249,7 @@ def test_game_creation(webclient, clean_content):
     assert (len(game.board.categories) == 6) & (len(game.board.categories[0].sets) == 5)
     assert (len(html_board) == 5) & (len(html_board[0]) == 6)
 
+    assert game.get("q_0_0").question == content["question"]
     assert not game.get("a_0_0")
 
     assert game.buzz_order == dict()
@@ -213,40 +257,119 @@ def test_game_creation(webclient, clean_content):
     game.buzz({"name": "False", "time": 2000})
     assert game.buzz_order == {"Test": {"time": 1000, "allowed": True}}
 
-    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=2&size=1").get_json()
-
     # Final Round
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
-        mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
-
         game.start_next_round()
 
+    assert not mock_urlopen.called
+
     assert game.round == 2
+    assert len(game.board.categories) == 1
     assert game.round_text() == f"Final {config.game_name}!"
     assert game.round_text(upcoming=True) == f"Tiebreaker {config.game_name}!"
     assert game.heading() == f"Final {config.game_name}!"
 
     # Checking for no round 4
+    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=3").get_json()
+
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
         mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
 
         game.start_next_round()
 
     assert game.round == 3
+    assert game.board.build_error
     assert game.round_text(upcoming=True) == "An error has occurred...."
 
 
-def test_game_creation_debug(webclient):
-    config.debug = True
-
-    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=0&size=6").get_json()
+def test_game_creation_in_process(webclient):
+    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?rounds=0,1,2&size=6").get_json()
 
     game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
 
     with mock.patch("urllib.request.urlopen") as mock_urlopen:
-        mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
+        game.make_board()
+        game.prefetching.join()
+
+    assert not mock_urlopen.called
+    assert [len(board.categories) for board in game.boards.values()] == [6, 6, 1]
+
+    names = [str(category) for board in game.boards.values() for category in board.categories]
+    assert len(names) == len(set(names)) == 13
+
+    # The game is built from the same data the API responds with
+    built = games.serialize(games.build({"rounds": "0,1,2", "size": 6}))
+    assert [len(board) for board in built] == [len(board) for board in data]
+    assert set(built[0][0]["category"]) == set(data[0][0]["category"])
+    assert set(built[0][0]["sets"][0]) == set(data[0][0]["sets"][0])
 
+
+def test_game_creation_prefetch_failure(webclient, caplog: pytest.LogCaptureFixture):
+    game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
+
+    with mock.patch("jeopardy.alex.Board.for_rounds", side_effect=RuntimeError):
         game.make_board()
+        game.prefetching.join()
+
+    assert set(game.boards) == {0}
+    assert "Couldn't build the boards of rounds [1, 2] for room ABCD" in caplog.text
+
+    # The next board is built when it's needed instead, still without any category used before
+    used = {str(category) for category in game.board.categories}
+    game.start_next_round()
+
+    assert not game.board.build_error and game.round == 1
+    assert len(game.board.categories) == 6
+    assert not used & {str(category) for category in game.board.categories}
+
+
+def test_game_creation_prefetch_reset(webclient):
+    game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
+
+    def slow(rounds, settings, exclude):
+        time.sleep(0.1)
+        return [mock.MagicMock(round=round_, build_error="") for round_ in rounds]
+
+    with mock.patch("jeopardy.alex.Board.for_rounds", side_effect=slow):
+        game.make_board()
+        first = game.prefetching
+
+        # Making the board again waits for the earlier prefetch, rather than letting it add its boards afterwards
+        game.make_board()
+
+        assert not first.is_alive() and set(game.boards) == {0}
+        game.prefetching.join()
+
+    assert set(game.boards) == {0, 1, 2}
+
+
+def test_remote_api(monkeypatch: pytest.MonkeyPatch):
+    for endpoint, remote in (
+        (f"http://127.0.0.1:{config.port}/api/v1/game", False),
+        (f"http://localhost:{config.port}/api/v1/game", False),
+        ("http://127.0.0.1:1/api/v1/game", True),
+        ("https://api.example.com/api/v1/game", True),
+    ):
+        monkeypatch.setattr(config, "api_endpoint", endpoint)
+        assert alex.remote_api() == remote
+
+
+def test_game_creation_error(webclient):
+    game = alex.Game(game_settings={"size": 6, "room": "ABCD", "show_number": 1, "show_id": 1})
+    game.make_board()
+
+    # Nothing more is built in the background for a game which couldn't be made
+    assert set(game.boards) == {0} and game.prefetching is None
+    assert game.board.build_error
+    assert game.board.message.endswith("Only one of Show Number or Show ID can be supplied at a time.")
+
+
+def test_game_creation_debug(webclient):
+    config.debug = True
+
+    game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
+
+    game.make_board()
 
     assert game.score.players == {
         "Alex": {
@@ -329,14 +452,9 @@ def test_scoreboard_methods():
 def test_game_reset(webclient):
     config.debug = True
 
-    data = webclient.flask_test_client.get(f"/api/v{config.api_version}/game?round=0&size=6").get_json()
-
     game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
 
-    with mock.patch("urllib.request.urlopen") as mock_urlopen:
-        mock_urlopen.return_value.read.return_value.decode.return_value = json.dumps(data)
-
-        game.make_board()
+    game.make_board()
 
     game.score.reset("score")
 
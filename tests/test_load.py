@@ -0,0 +1,73 @@
+import io
+import json
+import pathlib
+
+import pytest
+from sqlalchemy import func, select, inspect, create_engine
+from sqlalchemy.orm import Session
+
+from jeopardy import load
+from jeopardy.api.models import Set, Base, CategorySummary
+
+FILES = (pathlib.Path("tests/_files/complete.json"), pathlib.Path("tests/_files/incomplete.json"))
+
+
+@pytest.fixture
+def engine(tmp_path: pathlib.Path):
+    engine = create_engine(f"sqlite:///{tmp_path.joinpath('load.db')}")
+    load.tune(engine)
+
+    yield engine
+
+    engine.dispose()
+
+
+def test_iter_array():
+    expected = json.loads(FILES[0].read_text())
+
+    for chunk_size in (1, 7, 1 << 20):
+        with FILES[0].open() as handle:
+            assert list(load.iter_array(handle, chunk_size=chunk_size)) == expected
+
+    with pytest.raises(ValueError, match="must contain a JSON array"):
+        list(load.iter_array(io.StringIO('{"a": 1}')))
+
+    with pytest.raises(ValueError, match="not terminated"):
+        list(load.iter_array(io.StringIO('[{"a": 1}, ')))
+
+
+def test_load(engine, test_data):
+    assert load.load(engine=engine, paths=FILES, batch_size=25) == {
+        "inserted": len(test_data),
+        "duplicate": 0,
+        "error": 0,
+        "skipped": 0,
+    }
+
+    with Session(engine) as session:
+        assert session.scalar(select(func.count()).select_from(Set)) == len(test_data)
+        assert session.scalar(select(func.sum(CategorySummary.set_count))) == len(test_data)
+
+    inspector = inspect(engine)
+    assert {str(index.name) for table in Base.metadata.sorted_tables for index in table.indexes} <= {
+        index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)
+    }
+
+    assert load.load(engine=engine, paths=FILES)["skipped"] == len(test_data)
+    assert load.load(engine=engine, paths=FILES, restart=True)["duplicate"] == len(test_data)
+
+
+def test_load_ndjson(engine, test_data, tmp_path: pathlib.Path):
+    path = tmp_path.joinpath("sets.ndjson")
+    path.write_text("\n".join([json.dumps(test_data[0]), "{alex", "", json.dumps({**test_data[1], "round": 7})]))
+
+    messages: list[str] = []
+
+    assert load.load(engine=engine, paths=[path], defer_indexes=False, echo=messages.append) == {
+        "inserted": 1,
+        "duplicate": 0,
+        "error": 2,
+        "skipped": 0,
+    }
+    assert f"{path}:2: Please ensure the set is a JSON object" in messages
+    assert any(message.startswith(f"{path}:3: Please ensure the round number") for message in messages)
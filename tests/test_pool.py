@@ -0,0 +1,124 @@
+import time
+from unittest import mock
+
+import pytest
+from flask import url_for
+
+from jeopardy import alex, pool
+from jeopardy.api import database
+
+
+@pytest.fixture
+def board_pool(webclient):
+    app = webclient.flask_test_client.application
+
+    def func(size: int = 2, memory: int = 1 << 24) -> pool.BoardPool:
+        pool.POOL = pool.BoardPool(
+            app=app, fetch=alex.fetch, settings={"size": 6}, rounds=(0, 1, 2), size=size, memory=memory
+        )
+
+        return pool.POOL
+
+    yield func
+
+    pool.stop()
+
+
+def test_fill(board_pool):
+    boards = board_pool(size=3)
+
+    assert boards.fill() == 3
+    assert len(boards) == 3 and boards.bytes > 0
+    assert boards.fill() == 0
+
+    # Only as many games as fit in the memory cap are kept
+    boards = board_pool(size=3, memory=boards.bytes // 2)
+
+    assert boards.fill() == 1
+    assert len(boards) == 1 and boards.bytes <= boards.memory
+
+
+def test_take(board_pool):
+    boards = board_pool()
+    boards.fill()
+
+    game = alex.Game(game_settings={"size": 6, "room": "ABCD"})
+
+    with mock.patch("jeopardy.alex.fetch") as mock_fetch:
+        game.make_board()
+
+    assert not mock_fetch.called
+    assert boards.hits == 1 and boards.misses == 0 and len(boards) == 1
+    assert boards.wanted.is_set()
+
+    assert [len(board.categories) for board in game.boards.values()] == [6, 6, 1]
+
+    # Games with any other settings are always built for the room
+    assert pool.take({"size": 5, "room": "ABCD"}, rounds=(0, 1, 2)) is None
+    assert pool.take({"size": 6, "room": "ABCD"}, rounds=(1, 2)) is None
+    assert boards.hits == 1 and boards.misses == 0
+
+    assert pool.take({"size": 6}, rounds=(0, 1, 2)) is not None
+    assert pool.take({"size": 6}, rounds=(0, 1, 2)) is None
+    assert boards.hits == 2 and boards.misses == 1
+
+
+def test_background(webclient):
+    boards = pool.start(
+        webclient.flask_test_client.application, fetch=alex.fetch, settings={"size": 6}, size=2, memory=1 << 24
+    )
+
+    try:
+        for _ in range(100):
+            if len(boards) == 2:
+                break
+
+            time.sleep(0.05)
+
+        assert len(boards) == 2
+
+        # Taking a game wakes the thread up to replace it
+        assert pool.take({"size": 6}, rounds=(0, 1, 2)) is not None
+
+        for _ in range(100):
+            if len(boards) == 2:
+                break
+
+            time.sleep(0.05)
+
+        assert len(boards) == 2 and boards.hits == 1
+
+    finally:
+        pool.stop()
+
+    assert pool.POOL is None and boards.stopped.is_set()
+
+
+def test_clear(board_pool):
+    boards = board_pool()
+    boards.fill()
+
+    database.changed.send()
+
+    assert len(boards) == 0 and boards.bytes == 0
+
+
+def test_errors(board_pool):
+    boards = board_pool()
+    boards.fetch = lambda settings: (None, "Only 0 categories were found.")
+
+    assert boards.fill() == 0
+    assert boards.errors == 1
+
+
+def test_metrics(webclient, board_pool):
+    rv = webclient.flask_test_client.get(url_for("routing.route_metrics"))
+    assert rv.get_json()["board_pool"] == {"enabled": False}
+
+    board_pool().fill()
+
+    rv = webclient.flask_test_client.get(url_for("routing.route_metrics"))
+    metrics = rv.get_json()["board_pool"]
+
+    assert metrics["enabled"] and metrics["size"] == metrics["capacity"] == 2
+    assert metrics["hits"] == metrics["misses"] == 0
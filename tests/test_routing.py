@@ -81,6 +81,24 @@ def test_route_join(webclient):
     assert "readonly" in rv.get_data(as_text=True)  # Lowercase good magic link
 
 
+def test_route_closed_room(webclient, gen_room):
+    room = gen_room()
+    storage.GAMES.close(room, storage.EXPIRED)
+
+    rv = webclient.flask_test_client.get(url_for("routing.route_join", room=room))
+    assert "readonly" not in rv.get_data(as_text=True)
+    assert "inactive for too long" in rv.get_data(as_text=True)
+
+    rv = webclient.flask_test_client.post(
+        url_for("routing.route_play"), data={"room": room, "name": "Player"}, follow_redirects=True
+    )
+    assert "inactive for too long" in rv.get_data(as_text=True)
+    assert rv.request.path == "/join/"
+
+    rv = webclient.flask_test_client.get(url_for("routing.route_metrics"))
+    assert rv.get_json()["rooms"]["evictions"][storage.EXPIRED] >= 1
+
+
 def test_route_host_post(webclient, gen_room):
     rv = webclient.flask_test_client.post(
         url_for("routing.route_host"), headers={"Referer": "/new/"}, data={"size": 6}, follow_redirects=True
@@ -1,4 +1,6 @@
-from jeopardy import storage
+import pytest
+
+from jeopardy import pool, storage
 
 
 class TestDictStorage:
@@ -15,3 +17,83 @@ class TestDictStorage:
 
     def test_rooms(self):
         assert list(storage.rooms()) == [self.room]
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_room_ttl():
+    clock = Clock()
+    store = storage.RoomStore(ttl=60, capacity=0, clock=clock)
+
+    store["ABCD"] = "first"
+    clock.now = 30
+    store["EFGH"] = "second"
+
+    clock.now = 70
+    store.touch("EFGH")
+
+    # Expired rooms are closed as soon as they're looked up, even before they're swept
+    assert "ABCD" not in store and "EFGH" in store
+    assert store.closed == {"ABCD": storage.EXPIRED}
+
+    clock.now = 200
+    assert store.sweep() == 1 and len(store) == 0
+    assert store.evictions == {storage.EXPIRED: 2, storage.EVICTED: 0}
+
+    with pytest.raises(KeyError):
+        store["EFGH"]
+
+    # A new game in the same room reopens it
+    store["ABCD"] = "third"
+    assert store["ABCD"] == "third" and "ABCD" not in store.closed
+
+
+def test_room_capacity():
+    clock = Clock()
+    store = storage.RoomStore(ttl=0, capacity=2, clock=clock)
+
+    store["ABCD"] = "first"
+    store["EFGH"] = "second"
+
+    clock.now = 1_000_000
+    store.touch("ABCD")
+
+    # The least recently active room makes way for the new one, and rooms never expire without a ttl
+    store["IJKL"] = "third"
+
+    assert list(store) == ["ABCD", "IJKL"]
+    assert store.closed == {"EFGH": storage.EVICTED}
+    assert store.sweep() == 0
+
+
+def test_closed_message(monkeypatch: pytest.MonkeyPatch):
+    store = storage.RoomStore(ttl=60, capacity=1)
+    monkeypatch.setattr(storage, "GAMES", store)
+
+    storage.push("abcd", "first")
+    storage.push("efgh", "second")
+
+    assert storage.closed("ABCD") == storage.MESSAGES[storage.EVICTED]
+    assert storage.closed("efgh") is None and storage.closed("WXYZ") is None
+
+    metrics = storage.metrics()
+    assert metrics["rooms"] == 1 and metrics["evictions"][storage.EVICTED] == 1
+
+
+def test_room_footprint(webclient, gen_room):
+    room = gen_room()
+    game = storage.pull(room)
+
+    size = pool.footprint(game)
+    assert size > sum(len(content.answer) for category in game.board.categories for content in category.sets)
+
+    metrics = storage.metrics()
+    assert metrics["rooms"] == len(storage.GAMES) and metrics["bytes_per_room"] > 0
+
+    storage.GAMES.clear()
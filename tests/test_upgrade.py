@@ -0,0 +1,98 @@
+import pathlib
+import sqlite3
+import datetime
+
+import pytest
+from sqlalchemy import inspect, create_engine
+
+from jeopardy import web, config
+from jeopardy.api import search
+from jeopardy.upgrade import missing, upgrade
+from jeopardy.api.models import Base, sort_key
+
+
+def test_upgrade(tmp_path: pathlib.Path):
+    path = tmp_path.joinpath("upgrade.db")
+
+    with sqlite3.connect(path) as connection:
+        connection.executescript(pathlib.Path("tests/_files/test-full.db.sqlite").read_text())
+
+    engine = create_engine(f"sqlite:///{path}")
+
+    expected = {str(index.name) for table in Base.metadata.sorted_tables for index in table.indexes}
+    columns = {"date.ordinal", "category.date_ordinal", "set.date_ordinal", "set.sort_key"}
+
+    assert set(upgrade(engine)) == expected | columns | {"category_summary"} | set(search.INDEXES)
+    inspector = inspect(engine)
+    assert expected <= {
+        index["name"] for table in inspector.get_table_names() for index in inspector.get_indexes(table)
+    }
+
+    with sqlite3.connect(path) as connection:
+        for ordinal, year, month, day in connection.execute("SELECT ordinal, year, month, day FROM date"):
+            assert ordinal == (datetime.date(year, month, day) - datetime.date(1970, 1, 1)).days
+
+        assert not connection.execute('SELECT count(*) FROM "set" WHERE date_ordinal IS NULL').fetchone()[0]
+        assert not connection.execute(
+            'SELECT count(*) FROM "set" JOIN date ON date.id = "set".date_id WHERE "set".date_ordinal != date.ordinal'
+        ).fetchone()[0]
+
+        keys = connection.execute(
+            "SELECT s.sort_key, d.year, d.month, d.day, r.number, c.name, v.amount "
+            'FROM "set" s JOIN date d ON d.id = s.date_id JOIN round r ON r.id = s.round_id '
+            "JOIN category c ON c.id = s.category_id JOIN value v ON v.id = s.value_id"
+        )
+        for key, year, month, day, number, name, amount in keys:
+            assert key == sort_key(datetime.date(year, month, day), number, name, amount)
+
+    assert upgrade(engine) == []
+
+    summary = (
+        'SELECT category_id, count(*), sum(external), count(DISTINCT value_id) FROM "set" GROUP BY category_id '
+        "EXCEPT SELECT category_id, set_count, external_count, value_count FROM category_summary"
+    )
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute(summary).fetchall() == []
+        connection.execute("UPDATE category_summary SET external_count = 99")
+
+    assert upgrade(engine, rebuild=True) == []
+
+    with sqlite3.connect(path) as connection:
+        assert connection.execute(summary).fetchall() == []
+
+    # Search indexes created before their update triggers were limited to the indexed columns get the new triggers
+    with sqlite3.connect(path) as connection:
+        connection.execute("DROP TRIGGER set_search_update")
+        connection.execute('CREATE TRIGGER set_search_update AFTER UPDATE ON "set" BEGIN SELECT 1; END')
+
+    assert upgrade(engine) == []
+
+    with sqlite3.connect(path) as connection:
+        sql = connection.execute("SELECT sql FROM sqlite_master WHERE name = 'set_search_update'").fetchone()[0]
+        assert "AFTER UPDATE OF answer, question ON" in sql
+
+
+def test_create_app(tmp_path: pathlib.Path, monkeypatch: pytest.MonkeyPatch):
+    path = tmp_path.joinpath("outdated.db")
+
+    with sqlite3.connect(path) as connection:
+        connection.executescript(pathlib.Path("tests/_files/test-full.db.sqlite").read_text())
+
+    engine = create_engine(f"sqlite:///{path}")
+    monkeypatch.setattr(config, "api_db", f"sqlite:///{path}")
+    monkeypatch.setattr(config, "testing", True, raising=False)
+
+    with engine.connect() as connection:
+        assert {"category_summary", "set.sort_key", *search.INDEXES} <= set(missing(connection))
+
+    # The server refuses to start from a database it would fail to serve, rather than erroring on each request
+    with pytest.raises(RuntimeError, match="python -m jeopardy.upgrade"):
+        web.create_app()
+
+    upgrade(engine)
+
+    with engine.connect() as connection:
+        assert missing(connection) == []
+
+    assert web.create_app().test_client().get(f"/api/v{config.api_version}/game").status_code == 200